@@ -16,6 +16,10 @@ class Settings(BaseSettings):
     # Supabase
     supabase_url: str
     supabase_key: str  # service_role key
+    # Optional direct Postgres connection (Supavisor *session* mode - LISTEN needs a
+    # dedicated session) for push-based job cancellation and progress writes;
+    # empty = everything goes through the REST API
+    supabase_db_url: str = ""
 
     # BigQuery
     google_application_credentials: str
@@ -38,6 +42,12 @@ class Settings(BaseSettings):
     # Temp
     temp_dir: str = "temp"
 
+    # File copy (shared thread pool size for parallel copies)
+    copy_workers: int = 5
+
+    # Persistent ffprobe result cache (sqlite, keyed by path + size + mtime; empty to disable)
+    probe_cache_path: str = "temp/ffprobe_cache.sqlite"
+
     # Log retention
     log_retention_days: int = 7
 
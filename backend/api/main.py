@@ -10,6 +10,8 @@ from pathlib import Path
 
 from api.config import get_settings
 from api.routes import auth, jobs, queue, history, admin, uploads
+from services.storage import shutdown_pools
+from services.supabase import close_supabase_client
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -68,6 +70,8 @@ async def lifespan(app: FastAPI):
         await keepalive_task
     except asyncio.CancelledError:
         pass
+    shutdown_pools(wait=False)
+    close_supabase_client()
     logger.info("Application shutdown complete")
 
 # Initialize FastAPI
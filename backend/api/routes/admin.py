@@ -168,20 +168,26 @@ async def reorder_queue(request: ReorderQueueRequest):
         updated = 0
         errors = []
 
+        # Fetch every status in one round-trip instead of one select per job
+        job_ids = [item.job_id for item in request.positions]
+        statuses = {}
+        if job_ids:
+            status_result = supabase.table('jobs')\
+                .select('job_id, status')\
+                .in_('job_id', job_ids)\
+                .execute()
+            statuses = {row['job_id']: row['status'] for row in status_result.data or []}
+
         for item in request.positions:
             # Only update queued jobs
-            job_result = supabase.table('jobs')\
-                .select('status')\
-                .eq('job_id', item.job_id)\
-                .single()\
-                .execute()
+            status = statuses.get(item.job_id)
 
-            if not job_result.data:
+            if status is None:
                 errors.append(f"Job {item.job_id} not found")
                 continue
 
-            if job_result.data['status'] != 'queued':
-                errors.append(f"Job {item.job_id} is {job_result.data['status']}, cannot reorder")
+            if status != 'queued':
+                errors.append(f"Job {item.job_id} is {status}, cannot reorder")
                 continue
 
             # Update position
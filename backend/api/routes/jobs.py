@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 from services.bigquery import get_videos_info_by_ids, get_all_channel_assets, get_production_path, upsert_videos_bulk
-from services.storage import normalize_paths, normalize_path_for_server, copy_file_sequential, check_paths_exist
+from services.storage import normalize_paths, normalize_path_for_server, copy_file_sequential, check_paths_exist_async
 from services.supabase import get_supabase_client
 from services.logger import setup_validation_logger, setup_job_logger
 from utils.video_utils import get_videos_info_batch
@@ -170,11 +170,8 @@ async def verify_single_path(request: VerifyPathRequest):
         - resolution: Video resolution (WxH) if available
         - is_4k: Whether the video is 4K
     """
-    from services.storage import normalize_paths
-
     # Normalize the path
-    normalized_paths = normalize_paths([request.path])
-    normalized_path = normalized_paths[0] if normalized_paths else request.path
+    normalized_path = normalize_path_for_server(request.path)
 
     # Get video info using ffprobe (run in thread to avoid blocking)
     videos_info = await asyncio.to_thread(get_videos_info_batch, [normalized_path], 1)
@@ -299,9 +296,18 @@ async def verify_job(request: VerifyJobRequest, user_id: str, max_workers: int =
     items = []
     position = 1
 
+    # Steps 1 + 2 are independent BigQuery round-trips: run them concurrently
+    async def fetch_videos_info():
+        if not request.video_ids:
+            return {}
+        return await asyncio.to_thread(get_videos_info_by_ids, request.video_ids)
+
     # Step 1: Get channel branding assets (batched - single query)
     validation_logger.info("Step 1: Fetching channel branding assets (batched)...")
-    assets = await asyncio.to_thread(get_all_channel_assets, request.channel_name)
+    assets, videos_info = await asyncio.gather(
+        asyncio.to_thread(get_all_channel_assets, request.channel_name),
+        fetch_videos_info()
+    )
 
     # Apply user preferences for intro/outro/logos
     intro_path = assets['intro'] if request.include_intro else None
@@ -319,11 +325,9 @@ async def verify_job(request: VerifyJobRequest, user_id: str, max_workers: int =
         validation_logger.info(f"  Outro: {outro_path}")
     validation_logger.info("")
 
-    # Step 2: Batch query BigQuery for video IDs
-    videos_info = {}
+    # Step 2: Batch query BigQuery for video IDs (fetched alongside step 1)
     if request.video_ids:
-        validation_logger.info("Step 2: Fetching video info from BigQuery (batch query)...")
-        videos_info = await asyncio.to_thread(get_videos_info_by_ids, request.video_ids)
+        validation_logger.info("Step 2: Fetched video info from BigQuery (batch query)")
         validation_logger.info(f"  Found {len(videos_info)}/{len(request.video_ids)} videos in BigQuery")
         validation_logger.info("")
 
@@ -853,7 +857,7 @@ async def add_videos(request: AddVideosRequest):
     normalized_paths = normalize_paths(paths)
 
     # Step 2: Check which paths exist (parallel)
-    path_existence = await asyncio.to_thread(check_paths_exist, normalized_paths)
+    path_existence = await check_paths_exist_async(normalized_paths)
 
     # Step 3: Build results and collect valid videos
     results = []
@@ -1,42 +1,49 @@
 import os
+import re
+import mmap
+import errno
 import subprocess
 import shutil
 import logging
 import time
+import atexit
+import asyncio
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from api.config import get_settings
+from services import uring_copy
 
 logger = logging.getLogger(__name__)
 
-# Check which copy tools are available
-_RSYNC_AVAILABLE = None
-_CP_AVAILABLE = None
+# Larger buffer for shutil's read/write loop (used when sendfile isn't possible, e.g. SMB)
+if hasattr(shutil, "COPY_BUFSIZE"):
+    shutil.COPY_BUFSIZE = 4 * 1024 * 1024
 
-def _check_command_available(cmd: str) -> bool:
-    """Check if a command is available in PATH"""
-    try:
-        subprocess.run([cmd, "--version"], capture_output=True, timeout=5)
-        return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        return False
+# Check which copy tools are available (once, at import - PATH lookup only, no subprocess)
+_RSYNC_AVAILABLE = shutil.which("rsync") is not None
+logger.info(f"rsync available: {_RSYNC_AVAILABLE}")
 
 def is_rsync_available() -> bool:
-    """Check if rsync is available (cached)"""
-    global _RSYNC_AVAILABLE
-    if _RSYNC_AVAILABLE is None:
-        _RSYNC_AVAILABLE = _check_command_available("rsync")
-        logger.info(f"rsync available: {_RSYNC_AVAILABLE}")
+    """Check if rsync is available"""
     return _RSYNC_AVAILABLE
 
-def is_cp_available() -> bool:
-    """Check if cp is available (cached)"""
-    global _CP_AVAILABLE
-    if _CP_AVAILABLE is None:
-        _CP_AVAILABLE = _check_command_available("cp")
-        logger.info(f"cp available: {_CP_AVAILABLE}")
-    return _CP_AVAILABLE
+# Retry policy for copy_file_sequential: the whole fallback chain is re-run with backoff
+COPY_CHAIN_ATTEMPTS = 2
+COPY_RETRY_BASE_DELAY = 5  # seconds, doubled per attempt
+
+# Temp dirs with at least this many files are deleted with parallel unlinks
+PARALLEL_UNLINK_MIN_FILES = 10
+
+# Files below this size are copied in-process instead of spawning rsync/robocopy
+SMALL_FILE_THRESHOLD = 1024 * 1024  # 1 MiB
+
+# The shutil fallback reads sources above this size with O_DIRECT (Linux), so they
+# don't go through the page cache (and Docker overlay's double buffering)
+DIRECT_IO_THRESHOLD = 16 * 1024 * 1024  # 16 MiB
+DIRECT_IO_CHUNK = 1024 * 1024  # Multiple of any logical block size
 
 # Server IPs for each NAS
 NAS_SERVERS = {
@@ -57,6 +64,9 @@ SHARE_MAPPINGS = {
     "New_Share_4": "R:",
 }
 
+# Reverse lookup: drive letter -> share name (built once)
+_DRIVE_TO_SHARE = {drive.upper(): share for share, drive in SHARE_MAPPINGS.items()}
+
 # Which server each share lives on
 SHARE_SERVER = {
     "Share": "192.168.1.6",
@@ -85,9 +95,114 @@ DOCKER_MOUNTS = {
     "New_Share_4": "/mnt/new_share_4",
 }
 
-# Check if running in Docker with isolated network (needs mount conversion)
-# If using host network mode on Windows, drives are directly accessible
-IS_DOCKER = os.path.exists("/.dockerenv") and not os.path.exists("V:\\")
+# Check if running in Docker (needs mount conversion)
+# The Dockerfile sets CONTAINER_RUNTIME=docker; /.dockerenv covers images built without it
+IS_DOCKER = os.environ.get("CONTAINER_RUNTIME") == "docker" or os.path.exists("/.dockerenv")
+
+
+def _normalize_smb_url(path: str, rest: str) -> str:
+    """Case 1: SMB URL (smb://192.168.1.6/Share4/...)"""
+    # Extract share name and remaining path
+    # smb://192.168.1.6/Share3/Public/video -> Share3, Public/video
+    parts = rest.split("/")
+    if len(parts) >= 2:
+        share_name = parts[1]  # e.g., "Share3"
+        remaining = "/".join(parts[2:]) if len(parts) > 2 else ""
+
+        if IS_DOCKER and share_name in DOCKER_MOUNTS:
+            # Convert to Docker mount path
+            return f"{DOCKER_MOUNTS[share_name]}/{remaining}".rstrip("/")
+        # Convert to UNC path
+        server_ip = SHARE_SERVER.get(share_name, DEFAULT_NAS_IP)
+        return f"\\\\{server_ip}\\{share_name}\\{remaining}".replace("/", "\\")
+
+    # Fallback: simple conversion
+    return path.replace("smb://", "\\\\").replace("/", "\\")
+
+
+def _normalize_mac_volume(path: str, rest: str) -> str:
+    """Case 2: macOS volume (/Volumes/Share4/...)"""
+    share_name, _, remaining = rest.partition("/")  # e.g., "Share4", "path/file.mp4"
+
+    if IS_DOCKER and share_name in DOCKER_MOUNTS:
+        # Convert to Docker mount path
+        return f"{DOCKER_MOUNTS[share_name]}/{remaining}".rstrip("/")
+    # Convert to UNC
+    server_ip = SHARE_SERVER.get(share_name, DEFAULT_NAS_IP)
+    return f"\\\\{server_ip}\\{share_name}\\{remaining}".replace("/", "\\")
+
+
+def _normalize_drive_letter(path: str, rest: str) -> str:
+    """Case 3: Drive letter (V:\\Production\\...)"""
+    drive = path[:2]  # e.g., "V:"
+    # Find which share this drive maps to (drive letters are case-insensitive)
+    share_name = _DRIVE_TO_SHARE.get(drive.upper())
+
+    if share_name:
+        remaining = rest.lstrip("\\")
+        if IS_DOCKER and share_name in DOCKER_MOUNTS:
+            # Convert to Docker mount path
+            return f"{DOCKER_MOUNTS[share_name]}/{remaining}".replace("\\", "/")
+        # Convert to UNC path
+        server_ip = SHARE_SERVER.get(share_name, DEFAULT_NAS_IP)
+        return f"\\\\{server_ip}\\{share_name}\\{remaining}"
+    return path
+
+
+def _normalize_unc(path: str, rest: str) -> str:
+    """Case 4: Already Windows UNC (\\\\192.168.1.6\\...)"""
+    # Extract share name from UNC path
+    parts = rest.split("\\")
+    if len(parts) >= 2:
+        share_name = parts[1]  # 192.168.1.6\Share3\...
+        remaining = "\\".join(parts[2:])
+
+        if IS_DOCKER and share_name in DOCKER_MOUNTS:
+            # Convert to Docker mount path
+            return f"{DOCKER_MOUNTS[share_name]}/{remaining}".replace("\\", "/")
+        # Keep as UNC
+        return path.replace("/", "\\")
+    return path
+
+
+# Classify a path by its prefix in one regex scan, then dispatch to the matching handler.
+# Handlers get the full path plus the text after the matched prefix (no re-scan).
+_PATH_KIND = re.compile(r'^(?:(?P<smb>smb://)|(?P<vol>/Volumes/)|(?P<drv>[A-Za-z]:)|(?P<unc>\\\\))')
+# Inputs already in canonical form skip the regex/split/rebuild entirely
+_DOCKER_MOUNT_PREFIX = "/mnt/share"
+_DEFAULT_UNC_PREFIX = f"\\\\{DEFAULT_NAS_IP}\\"
+
+_PATH_HANDLERS = {
+    'smb': _normalize_smb_url,
+    'vol': _normalize_mac_volume,
+    'drv': _normalize_drive_letter,
+    'unc': _normalize_unc,
+}
+
+
+@lru_cache(maxsize=8192)
+def _normalize_one(path: str) -> str:
+    """
+    Normalize a single non-empty path (see normalize_paths).
+
+    Memoized: the same source paths are normalized again at every job stage
+    (validation, existence checks, copy). Only depends on module constants.
+    """
+    # Remove quotes if present
+    path = path.strip().strip('"').strip("'")
+
+    # Fast path: already canonical (Docker mount, or default-NAS UNC outside Docker)
+    if path.startswith(_DOCKER_MOUNT_PREFIX) or (
+        not IS_DOCKER and path.startswith(_DEFAULT_UNC_PREFIX) and "/" not in path
+    ):
+        return path
+
+    match = _PATH_KIND.match(path)
+    if match is None:
+        # Case 5: Unknown format - keep as is
+        return path
+    return _PATH_HANDLERS[match.lastgroup](path, path[match.end():])
+
 
 def normalize_paths(paths: List[str]) -> List[str]:
     """
@@ -114,109 +229,110 @@ def normalize_paths(paths: List[str]) -> List[str]:
             "\\\\192.168.1.6\\Share4\\video3.mp4"
         ]
     """
-    normalized = []
+    return [_normalize_one(path) if path else path for path in paths]
 
-    for path in paths:
-        if not path:
-            normalized.append(path)
-            continue
+# Shared pools, created once instead of per call (see shutdown_pools)
+# _CHECK_POOL runs short metadata operations (existence checks, temp dir unlinks)
+_CHECK_POOL = ThreadPoolExecutor(max_workers=10, thread_name_prefix="check")
+_COPY_POOL = ThreadPoolExecutor(max_workers=get_settings().copy_workers, thread_name_prefix="copy")
+# Background temp dir deletion (cleanup_temp_dir returns without waiting)
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cleanup")
+# Let queued deletions finish on normal interpreter exit
+atexit.register(_CLEANUP_POOL.shutdown, wait=True)
 
-        # Remove quotes if present
-        path = path.strip().strip('"').strip("'")
-
-        # Case 1: SMB URL (smb://192.168.1.6/Share4/...)
-        if path.startswith("smb://"):
-            # Extract share name and remaining path
-            # smb://192.168.1.6/Share3/Public/video -> Share3, Public/video
-            parts = path.replace("smb://", "").split("/")
-            if len(parts) >= 2:
-                share_name = parts[1]  # e.g., "Share3"
-                remaining = "/".join(parts[2:]) if len(parts) > 2 else ""
-
-                if IS_DOCKER and share_name in DOCKER_MOUNTS:
-                    # Convert to Docker mount path
-                    path = f"{DOCKER_MOUNTS[share_name]}/{remaining}".rstrip("/")
-                else:
-                    # Convert to UNC path
-                    server_ip = SHARE_SERVER.get(share_name, DEFAULT_NAS_IP)
-                    path = f"\\\\{server_ip}\\{share_name}\\{remaining}".replace("/", "\\")
-            else:
-                # Fallback: simple conversion
-                path = path.replace("smb://", "\\\\")
-                path = path.replace("/", "\\")
-            normalized.append(path)
-            continue
 
-        # Case 2: macOS volume (/Volumes/Share4/...)
-        if path.startswith("/Volumes/"):
-            # Extract share name
-            parts = path.split("/")
-            if len(parts) >= 3:
-                share_name = parts[2]  # e.g., "Share4"
-                remaining = "/".join(parts[3:])
-
-                if IS_DOCKER and share_name in DOCKER_MOUNTS:
-                    # Convert to Docker mount path
-                    path = f"{DOCKER_MOUNTS[share_name]}/{remaining}".rstrip("/")
-                else:
-                    # Convert to UNC
-                    server_ip = SHARE_SERVER.get(share_name, DEFAULT_NAS_IP)
-                    path = f"\\\\{server_ip}\\{share_name}\\{remaining}"
-                    path = path.replace("/", "\\")
-            normalized.append(path)
-            continue
+def shutdown_pools(wait: bool = True):
+    """Shut down the shared copy/check thread pools (call on process exit)"""
+    _COPY_POOL.shutdown(wait=wait, cancel_futures=True)
+    _CLEANUP_POOL.shutdown(wait=wait)  # Queued deletions still run
+    _CHECK_POOL.shutdown(wait=wait, cancel_futures=True)
 
-        # Case 3: Drive letter (V:\Production\...)
-        if len(path) >= 2 and path[1] == ":":
-            drive = path[:2]  # e.g., "V:"
-            # Find which share this drive maps to
-            share_name = None
-            for share, mapped_drive in SHARE_MAPPINGS.items():
-                if mapped_drive == drive:
-                    share_name = share
-                    break
+# Short-lived directory listings keyed on parent dir: {dir: (timestamp, entry names)}
+SCANDIR_CACHE_TTL = 2.0  # seconds
+SCANDIR_MIN_PATHS = 3  # List a directory only when at least this many checked paths live in it
+_scandir_cache: Dict[str, Tuple[float, Set[str]]] = {}
 
-            if share_name:
-                remaining = path[2:].lstrip("\\")
-                if IS_DOCKER and share_name in DOCKER_MOUNTS:
-                    # Convert to Docker mount path
-                    path = f"{DOCKER_MOUNTS[share_name]}/{remaining}".replace("\\", "/")
-                else:
-                    # Convert to UNC path
-                    server_ip = SHARE_SERVER.get(share_name, DEFAULT_NAS_IP)
-                    path = f"\\\\{server_ip}\\{share_name}\\{remaining}"
-            normalized.append(path)
-            continue
 
-        # Case 4: Already Windows UNC (\\192.168.1.6\...)
-        if path.startswith("\\\\"):
-            # Extract share name from UNC path
-            parts = path.split("\\")
-            if len(parts) >= 4:
-                share_name = parts[3]  # \\192.168.1.6\Share3\...
-                remaining = "\\".join(parts[4:])
-
-                if IS_DOCKER and share_name in DOCKER_MOUNTS:
-                    # Convert to Docker mount path
-                    path = f"{DOCKER_MOUNTS[share_name]}/{remaining}".replace("\\", "/")
-                else:
-                    # Keep as UNC
-                    path = path.replace("/", "\\")
-            normalized.append(path)
-            continue
+def _list_dir_cached(dirname: str) -> Optional[Set[str]]:
+    """Return the entry names of a directory (cached for SCANDIR_CACHE_TTL), None if unreadable"""
+    now = time.monotonic()
+    cached = _scandir_cache.get(dirname)
+    if cached and now - cached[0] < SCANDIR_CACHE_TTL:
+        return cached[1]
 
-        # Case 5: Unknown format - keep as is
-        normalized.append(path)
+    try:
+        with os.scandir(dirname) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        return None
+
+    if len(_scandir_cache) > 1024:
+        # Drop expired listings so the cache doesn't grow without bound
+        for key, (ts, _) in list(_scandir_cache.items()):
+            if now - ts >= SCANDIR_CACHE_TTL:
+                _scandir_cache.pop(key, None)
+    _scandir_cache[dirname] = (now, names)
+    return names
+
+
+EXISTS_CACHE_TTL = 60.0  # seconds
+_exists_cache: Dict[str, Tuple[float, int]] = {}
+
+
+def _stat_size_cached(path: str) -> Optional[int]:
+    """
+    Return the size of a file (cached for EXISTS_CACHE_TTL), None if it doesn't exist.
+
+    Only successful stats are cached, so a path that was missing and gets
+    fixed by the user is picked up on the next check.
+    """
+    now = time.monotonic()
+    cached = _exists_cache.get(path)
+    if cached and now - cached[0] < EXISTS_CACHE_TTL:
+        return cached[1]
+
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return None
 
-    return normalized
+    if len(_exists_cache) > 4096:
+        # Drop expired entries so the cache doesn't grow without bound
+        for key, (ts, _) in list(_exists_cache.items()):
+            if now - ts >= EXISTS_CACHE_TTL:
+                _exists_cache.pop(key, None)
+    _exists_cache[path] = (now, size)
+    return size
 
-def check_paths_exist(paths: List[str], max_workers: int = 10) -> Dict[str, bool]:
+
+def _exists_cached(path: str) -> bool:
+    """os.path.exists() backed by the stat cache"""
+    return _stat_size_cached(path) is not None
+
+
+def invalidate_exists(path: str):
+    """Drop cached stats for a path (and anything under it, if it is a directory)"""
+    _exists_cache.pop(path, None)
+    prefix = path.rstrip("/\\") + ("\\" if path.startswith("\\\\") else "/")
+    # Snapshot the keys: the prefetch thread may insert while we iterate
+    for key in list(_exists_cache):
+        if key.startswith(prefix):
+            _exists_cache.pop(key, None)
+
+
+def check_paths_exist(paths: List[str]) -> Dict[str, bool]:
     """
     Check if multiple paths exist in parallel (batch operation).
 
+    Paths are grouped by parent directory; directories holding at least
+    SCANDIR_MIN_PATHS of them are listed once (one READDIR round-trip answers
+    every path in it), smaller groups are stat'ed per path. Listings are cached
+    for SCANDIR_CACHE_TTL so repeated checks within a job reuse them. Names not
+    in a listing are confirmed with a regular stat (listing errors such as
+    PermissionError, case differences).
+
     Args:
         paths: List of paths to check (any format)
-        max_workers: Maximum parallel checks (default: 10)
 
     Returns:
         Dict mapping original path to existence status
@@ -231,72 +347,143 @@ def check_paths_exist(paths: List[str], max_workers: int = 10) -> Dict[str, bool
     Performance:
         - Sequential: 17 SMB paths × 0.1s = 1.7 seconds
         - Parallel (10 workers): 17 paths ÷ 10 = ~0.2 seconds
+        - Grouped by folder: one listing per directory instead of one stat per path
+        - io_uring (Linux 5.6+ with liburing): one STATX batch, one submit for all paths
     """
     if not paths:
         return {}
 
     normalized = normalize_paths(paths)
+
+    if uring_copy.is_available():
+        results = _check_paths_uring(paths, normalized)
+        if results is not None:
+            return results
+
     results = {}
+    futures = [
+        _CHECK_POOL.submit(_check_directory, paths, normalized, dirname, indices)
+        for dirname, indices in _group_by_dir(normalized).items()
+    ]
+    for future in as_completed(futures):
+        for original, exists in future.result():
+            results[original] = exists
+
+    return results
+
+
+async def check_paths_exist_async(paths: List[str]) -> Dict[str, bool]:
+    """
+    Async variant of check_paths_exist() for FastAPI endpoints.
+
+    Same strategy (io_uring batch, else grouped listings), but the event loop
+    awaits the work on _CHECK_POOL directly instead of parking a to_thread()
+    worker that itself waits on the pool.
+    """
+    if not paths:
+        return {}
 
-    def check_single_path(path_tuple):
-        """Check if a single path exists"""
-        original, normalized_path = path_tuple
+    normalized = normalize_paths(paths)
+    loop = asyncio.get_running_loop()
+
+    if uring_copy.is_available():
+        results = await loop.run_in_executor(_CHECK_POOL, _check_paths_uring, paths, normalized)
+        if results is not None:
+            return results
+
+    groups = await asyncio.gather(*(
+        loop.run_in_executor(_CHECK_POOL, _check_directory, paths, normalized, dirname, indices)
+        for dirname, indices in _group_by_dir(normalized).items()
+    ))
+    return {original: exists for checked in groups for original, exists in checked}
+
+
+def _check_paths_uring(paths: List[str], normalized: List[str]) -> Optional[Dict[str, bool]]:
+    """Check every path with one io_uring STATX batch, None if the ring failed"""
+    results = {}
+    try:
+        for original, normalized_path, exists in zip(
+            paths, normalized, uring_copy.stat_paths(normalized)
+        ):
+            if not exists:
+                logger.warning(f"Path not found: {normalized_path}")
+            results[original] = exists
+    except Exception as e:
+        logger.warning(f"io_uring stat batch failed, falling back to directory listings: {e}")
+        return None
+    return results
+
+
+def _group_by_dir(normalized: List[str]) -> Dict[str, List[int]]:
+    """Group path indices by parent directory"""
+    by_dir: Dict[str, List[int]] = {}
+    for i, normalized_path in enumerate(normalized):
+        by_dir.setdefault(os.path.dirname(normalized_path), []).append(i)
+    return by_dir
+
+
+def _check_directory(
+    paths: List[str],
+    normalized: List[str],
+    dirname: str,
+    indices: List[int]
+) -> List[Tuple[str, bool]]:
+    """Check every path of one directory against a single listing"""
+    # A listing only pays off when it answers several stats (large folders cost more than one stat)
+    entries = _list_dir_cached(dirname) if len(indices) >= SCANDIR_MIN_PATHS else None
+    checked = []
+    for i in indices:
+        original, normalized_path = paths[i], normalized[i]
         try:
-            exists = os.path.exists(normalized_path)
+            exists = entries is not None and os.path.basename(normalized_path) in entries
+            if not exists:
+                exists = _exists_cached(normalized_path)
             if not exists:
                 logger.warning(f"Path not found: {normalized_path}")
-            return original, exists
+            checked.append((original, exists))
         except Exception as e:
             logger.error(f"Error checking path {normalized_path}: {e}", exc_info=True)
-            return original, False
-
-    # Parallel path existence checks using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        path_tuples = list(zip(paths, normalized))
-
-        # Submit all path checks
-        future_to_path = {
-            executor.submit(check_single_path, pt): pt
-            for pt in path_tuples
-        }
+            checked.append((original, False))
+    return checked
 
-        # Collect results as they complete
-        for future in as_completed(future_to_path):
-            original, exists = future.result()
-            results[original] = exists
-
-    return results
 
 def copy_file_sequential(
     source_path: str,
     dest_dir: str,
     dest_filename: Optional[str] = None,
-    use_optimal_method: bool = True
+    use_optimal_method: bool = True,
+    skip_existence_check: bool = False,
+    _skip_mkdir: bool = False
 ) -> Optional[str]:
     """
     Copy a single file with automatic method selection and fallback chain.
 
     Fallback chain (Docker/Linux):
       1. rsync (fastest, 3.5x faster than alternatives)
-      2. cp (fallback, still faster than shutil)
+      2. sendfile (in-process copy_file_range/sendfile, no subprocess)
       3. shutil (final fallback, cross-platform)
 
     Windows fallback chain:
       1. robocopy (fastest for Windows)
       2. shutil (final fallback)
 
+    Files under SMALL_FILE_THRESHOLD (1 MiB) are copied in-process first.
+    If every method fails, the whole chain is retried (COPY_CHAIN_ATTEMPTS, exponential backoff).
+
     Args:
         source_path: Source file path (any format)
         dest_dir: Destination directory
         dest_filename: Optional destination filename (if None, use original name)
         use_optimal_method: If True, try OS-specific optimal method first; if False, use shutil only
+        skip_existence_check: If True, skip the destination already-copied probe
+                              (caller guarantees a fresh dest_dir; saves SMB round-trips)
 
     Returns:
         Destination file path if success, None if failed
 
     Performance (Docker, 695MB test):
         - rsync: 14-20s (FASTEST)
-        - cp: 46-75s
+        - cp (the subprocess sendfile replaced): 46-75s
         - shutil: 42-124s
 
     Note:
@@ -317,19 +504,20 @@ def copy_file_sequential(
     logger.info(f"  dest_filename: {dest_filename}")
 
     # Normalize source path
-    normalized_source = normalize_paths([source_path])[0]
+    normalized_source = _normalize_one(source_path) if source_path else source_path
     source_file_path = Path(normalized_source)
 
-    # Prepare destination
+    # Prepare destination (batch callers create it once up front)
     dest_path = Path(dest_dir)
-    dest_path.mkdir(parents=True, exist_ok=True)
+    if not _skip_mkdir:
+        dest_path.mkdir(parents=True, exist_ok=True)
 
     # Build dest_file path with consistent slashes (avoid Path / operator mixing slashes)
     if dest_filename:
         filename = dest_filename
         logger.info(f"  Using provided dest_filename: {filename}")
     else:
-        filename = source_file_path.name
+        filename = os.path.basename(normalized_source)
         logger.info(f"  Using source filename: {filename}")
 
     # Use appropriate separator based on path type
@@ -339,63 +527,169 @@ def copy_file_sequential(
         dest_file_str = f"{dest_dir}/{filename}"
     dest_file = Path(dest_file_str)
 
-    # Check if source exists
-    if not source_file_path.exists():
+    # Check if source exists (cached stat, shared with check_paths_exist and the prefetch;
+    # size is reused for the copy timeouts)
+    source_size = _stat_size_cached(normalized_source)
+    if source_size is None:
         logger.error(f"Source file not found: {normalized_source}")
         return None
 
     # Check if destination already exists (skip if prefetched)
-    if dest_file.exists():
-        source_size = source_file_path.stat().st_size
-        dest_size = dest_file.stat().st_size
+    dest_size = None
+    if not skip_existence_check:
+        try:
+            dest_size = dest_file.stat().st_size
+        except OSError:
+            pass
+    if dest_size is not None:
         if source_size == dest_size:
             logger.info(f"  Skipping (already exists): {dest_file.name}")
             return dest_file_str  # Return consistent path string
         else:
             logger.warning(f"  File exists but size mismatch ({dest_size} != {source_size}), re-copying: {dest_file.name}")
 
+    # Small files (logos, subtitles): one read/write beats forking rsync/robocopy
+    if source_size < SMALL_FILE_THRESHOLD:
+        if _copy_small_file(normalized_source, dest_file):
+            return dest_file_str
+        logger.warning("Small file copy failed, trying regular copy chain")
+
+    # Whole-chain retry: if every method failed, back off and run the chain again
+    for attempt in range(COPY_CHAIN_ATTEMPTS):
+        if _copy_with_fallback_chain(normalized_source, source_file_path, dest_path, dest_file,
+                                     source_size, use_optimal_method):
+            return dest_file_str
+        if attempt < COPY_CHAIN_ATTEMPTS - 1:
+            delay = COPY_RETRY_BASE_DELAY * (2 ** attempt)
+            logger.warning(f"All copy methods failed (attempt {attempt + 1}/{COPY_CHAIN_ATTEMPTS}), retrying in {delay}s...")
+            time.sleep(delay)
+
+    return None
+
+
+def _copy_with_fallback_chain(
+    normalized_source: str,
+    source_file_path: Path,
+    dest_path: Path,
+    dest_file: Path,
+    source_size: int,
+    use_optimal_method: bool
+) -> bool:
+    """Run one pass of the OS-specific copy fallback chain (see copy_file_sequential)"""
     if not use_optimal_method:
         # Skip to shutil directly
-        if _copy_with_shutil(normalized_source, dest_file):
-            return dest_file_str
-        return None
+        return bool(_copy_with_shutil(normalized_source, dest_file, source_size))
 
     # ========== LINUX / DOCKER ==========
     if IS_DOCKER:
+        # Same filesystem (e.g. output -> production on one share): copy_file_range can
+        # reflink or do an SMB server-side copy, so no bytes cross the network
+        same_fs = _same_filesystem(normalized_source, dest_path)
+        if same_fs:
+            if _copy_with_sendfile(normalized_source, dest_file):
+                return True
+            logger.warning("In-kernel copy failed, trying rsync")
+
         # Method 1: Try rsync (best for network shares)
-        if is_rsync_available():
-            if _copy_with_rsync(normalized_source, dest_file):
-                return dest_file_str
-            logger.warning("rsync failed, trying cp fallback")
+        if _RSYNC_AVAILABLE:
+            if _copy_with_rsync(normalized_source, dest_file, source_size):
+                return True
+            logger.warning("rsync failed, trying sendfile fallback")
 
-        # Method 2: Try cp with retry logic
-        if is_cp_available():
-            if _copy_with_cp(normalized_source, dest_file):
-                return dest_file_str
-            logger.warning("cp failed, trying shutil fallback")
+        # Method 2: In-kernel copy (single attempt - the chain itself is retried by the caller)
+        if not same_fs:
+            if _copy_with_sendfile(normalized_source, dest_file):
+                return True
+            logger.warning("sendfile failed, trying shutil fallback")
 
         # Method 3: Final fallback to shutil
-        if _copy_with_shutil(normalized_source, dest_file):
-            return dest_file_str
-        return None
+        return bool(_copy_with_shutil(normalized_source, dest_file, source_size))
 
     # ========== WINDOWS ==========
     else:
         # Method 1: Try robocopy
         if _copy_with_robocopy(source_file_path, dest_path, dest_file):
-            return dest_file_str
+            return True
         logger.warning("robocopy failed, trying shutil fallback")
 
         # Method 2: Final fallback to shutil
-        if _copy_with_shutil(normalized_source, dest_file):
-            return dest_file_str
+        return bool(_copy_with_shutil(normalized_source, dest_file, source_size))
+
+
+# Device id per directory: a copy only stats a folder the first time it's seen, not
+# the SMB source file on every copy. A stale entry only picks a different (still
+# working) copy method first.
+_dir_device_cache: Dict[str, int] = {}
+
+
+def _dir_device(directory: str) -> Optional[int]:
+    """st_dev of a directory (cached; failures aren't cached), None if it can't be stat'ed"""
+    device = _dir_device_cache.get(directory)
+    if device is None:
+        try:
+            device = os.stat(directory).st_dev
+        except OSError:
+            return None
+        _dir_device_cache[directory] = device
+    return device
+
+
+def _same_filesystem(source: str, dest_dir: Path) -> bool:
+    """Check if source and dest_dir are on the same device (False if either can't be stat'ed)"""
+    source_device = _dir_device(os.path.dirname(source))
+    return source_device is not None and source_device == _dir_device(str(dest_dir))
+
+
+def _stderr_tail(raw: Optional[bytes], limit: int = 2048) -> str:
+    """Decode only the tail of a subprocess's raw stderr (error path only - success never decodes)"""
+    return raw[-limit:].decode('utf-8', errors='replace') if raw else ""
+
+
+# Per-thread reusable buffer for _copy_small_file (one allocation per copy thread, not per file)
+_small_copy_buffers = threading.local()
+
+
+def _copy_small_file(source: str, dest: Path) -> Optional[str]:
+    """Copy a small file in-process with a single read and write (no subprocess)"""
+    buf = getattr(_small_copy_buffers, "buf", None)
+    if buf is None:
+        buf = _small_copy_buffers.buf = memoryview(bytearray(SMALL_FILE_THRESHOLD))
+    try:
+        with open(source, 'rb', buffering=0) as src, open(dest, 'wb', buffering=0) as dst:
+            # readinto() may return short counts; loop until EOF (file may grow past the threshold)
+            while True:
+                n = src.readinto(buf)
+                if not n:
+                    break
+                written = 0
+                while written < n:
+                    written += dst.write(buf[written:n])
+        logger.info(f"✓ Small file copied: {dest}")
+        return str(dest)
+    except Exception as e:
+        logger.warning(f"Small file copy error: {e}")
         return None
 
 
-def _copy_with_rsync(source: str, dest: Path) -> Optional[str]:
+@lru_cache()
+def _temp_root() -> str:
+    """Absolute settings.temp_dir, with a trailing separator"""
+    return os.path.join(os.path.abspath(get_settings().temp_dir), "")
+
+
+def _copy_with_rsync(source: str, dest: Path, src_size: int) -> Optional[str]:
     """
     Copy file using rsync (Linux - best for network shares).
 
+    Flags are tuned for a LAN copy: no delta algorithm (--whole-file skips the
+    read-checksum pass that doubles SMB reads), no compression, no metadata
+    syscalls. Copies into the per-job temp dir (always a fresh destination) also
+    skip rsync's quick check (--size-only, --no-times); anywhere else, e.g. the
+    output share, the default size + mtime check keeps a stale same-size file
+    from passing as up to date.
+    -v is only passed at DEBUG level, so rsync doesn't format per-file output
+    nobody reads.
+
     Timeout calculation:
         - Base: 1200s (20 min) for files < 10GB
         - Large files: file_size_gb * 120s per GB
@@ -409,8 +703,7 @@ def _copy_with_rsync(source: str, dest: Path) -> Optional[str]:
     """
     try:
         # Calculate dynamic timeout based on file size
-        file_size_bytes = os.path.getsize(source)
-        file_size_gb = file_size_bytes / (1024 ** 3)
+        file_size_gb = src_size / (1024 ** 3)
 
         # Dynamic timeout: 120 seconds per GB, min 1200s (20 min), max 3600s (1 hour)
         io_timeout = max(1200, min(3600, int(file_size_gb * 120)))
@@ -428,13 +721,28 @@ def _copy_with_rsync(source: str, dest: Path) -> Optional[str]:
             f"--timeout={io_timeout}",  # Dynamic I/O timeout based on file size
             "--no-compress",            # Don't compress (video files are already compressed)
             "--whole-file",             # Copy entire file (faster for large files, no delta transfer)
+            "--inplace",                # Write directly to dest (no temp file + rename)
+            "--no-perms",               # Skip metadata syscalls (chmod/chown) -
+            "--no-owner",               # irrelevant for temp/output copies
+            "--no-group",
             source,
             dest_str
         ]
+        if os.path.abspath(dest_str).startswith(_temp_root()):
+            # Fresh per-job dest: same size is enough, and its mtime is never compared again
+            cmd[-2:-2] = ["--size-only", "--no-times"]
+
+        verbose = logger.isEnabledFor(logging.DEBUG)
+        if verbose:
+            cmd.insert(1, "-v")
 
         logger.info(f"Copying with rsync: {source} → {dest_str}")
         logger.info(f"rsync command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, encoding='utf-8', errors='replace', timeout=process_timeout)
+        # stderr is piped for the failure message; stdout only when it gets logged
+        result = subprocess.run(cmd, stdout=subprocess.PIPE if verbose else subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, timeout=process_timeout)
+        if verbose and result.stdout:
+            logger.debug(f"rsync output: {_stderr_tail(result.stdout)}")
 
         if result.returncode == 0:
             # Verify the file was created with correct name
@@ -453,7 +761,7 @@ def _copy_with_rsync(source: str, dest: Path) -> Optional[str]:
                 logger.warning(f"rsync returned success but file not found: {dest_str}")
                 return None
         else:
-            logger.warning(f"rsync failed (code {result.returncode}): {result.stderr}")
+            logger.warning(f"rsync failed (code {result.returncode}): {_stderr_tail(result.stderr)}")
             return None
 
     except Exception as e:
@@ -461,39 +769,30 @@ def _copy_with_rsync(source: str, dest: Path) -> Optional[str]:
         return None
 
 
-def _copy_with_cp(source: str, dest: Path) -> Optional[str]:
-    """Copy file using cp with retry logic (Linux fallback)"""
-    # Calculate dynamic timeout based on file size
-    file_size_bytes = os.path.getsize(source)
-    file_size_gb = file_size_bytes / (1024 ** 3)
-    timeout = max(1200, min(3600, int(file_size_gb * 120)))
-
-    for attempt in range(3):
-        try:
-            cmd = ["cp", source, str(dest)]
-
-            logger.info(f"Copying with cp (attempt {attempt + 1}/3): {source} → {dest}")
-            result = subprocess.run(cmd, capture_output=True, encoding='utf-8', errors='replace', timeout=timeout, check=True)
-
-            logger.info(f"✓ cp successful: {dest}")
-            return str(dest)
-
-        except subprocess.CalledProcessError as e:
-            if attempt < 2:
-                logger.warning(f"cp failed (attempt {attempt + 1}/3), retrying in 5 seconds...")
-                time.sleep(5)
-            else:
-                logger.warning(f"cp failed after 3 attempts: {e.stderr}")
-                return None
-        except Exception as e:
-            logger.warning(f"cp error: {e}")
+def _copy_with_sendfile(source: str, dest: Path) -> Optional[str]:
+    """Copy file in-process with copy_file_range/sendfile (Linux fallback, single attempt, no fork/exec)"""
+    try:
+        logger.info(f"Copying with sendfile: {source} → {dest}")
+        if not _copy_zero_copy(source, dest):
+            logger.warning("sendfile/copy_file_range not supported here")
             return None
 
-    return None
+        logger.info(f"✓ sendfile successful: {dest}")
+        return str(dest)
+
+    except Exception as e:
+        logger.warning(f"sendfile error: {e}")
+        return None
 
 
 def _copy_with_robocopy(source_file_path: Path, dest_path: Path, dest_file: Path) -> Optional[str]:
-    """Copy file using robocopy (Windows)"""
+    """
+    Copy file using robocopy (Windows).
+
+    /MT:16 copies multithreaded (robocopy falls back gracefully for one file);
+    /NFL /NDL /NJH /NJS /NC /NS suppress the per-file log lines robocopy would
+    otherwise write to the pipe.
+    """
     try:
         source_dir = str(source_file_path.parent)
         source_filename = source_file_path.name
@@ -504,16 +803,20 @@ def _copy_with_robocopy(source_file_path: Path, dest_path: Path, dest_file: Path
             source_dir,
             str(dest_path),
             source_filename,
+            "/MT:16",    # Multithreaded copy
             "/R:3",      # Retry 3 times on failure
             "/W:5",      # Wait 5 seconds between retries
             "/NP",       # No progress (less verbose)
+            "/NFL",      # No file list
             "/NDL",      # No directory list
             "/NJH",      # No job header
-            "/NJS"       # No job summary
+            "/NJS",      # No job summary
+            "/NC",       # No file classes
+            "/NS"        # No file sizes
         ]
 
         logger.info(f"Copying with robocopy: {source_file_path} → {dest_file}")
-        result = subprocess.run(cmd, capture_output=True, encoding='utf-8', errors='replace', timeout=300)
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=300)
 
         # Robocopy exit codes: 0-7 are success, 8+ are errors
         if result.returncode < 8:
@@ -525,7 +828,7 @@ def _copy_with_robocopy(source_file_path: Path, dest_path: Path, dest_file: Path
             logger.info(f"✓ robocopy successful: {dest_file}")
             return str(dest_file)
         else:
-            logger.warning(f"robocopy failed (code {result.returncode})")
+            logger.warning(f"robocopy failed (code {result.returncode}): {_stderr_tail(result.stderr)}")
             return None
 
     except Exception as e:
@@ -533,12 +836,154 @@ def _copy_with_robocopy(source_file_path: Path, dest_path: Path, dest_file: Path
         return None
 
 
-def _copy_with_shutil(source: str, dest: Path) -> Optional[str]:
-    """Copy file using shutil (cross-platform fallback)"""
+def _copy_zero_copy(source: str, dest: Path) -> bool:
+    """
+    Copy file data in-kernel with copy_file_range(), then sendfile() (Linux).
+
+    Bytes never pass through Python buffers, which matters on CIFS mounts where
+    shutil falls back to a read/write loop on some kernels.
+
+    Returns:
+        True only if every byte was copied, False if neither syscall is supported
+        here (including a 0-byte result at offset 0) or the copy came up short
+
+    Raises:
+        OSError: On real I/O errors
+    """
+    if not hasattr(os, "sendfile"):
+        return False
+
+    src_fd = os.open(source, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            size = os.fstat(src_fd).st_size
+            remaining = size
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            # Both calls advance the shared file offsets, so sendfile resumes where copy_file_range stopped
+            use_copy_range = hasattr(os, "copy_file_range")
+            while remaining > 0:
+                try:
+                    if use_copy_range:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    else:
+                        copied = os.sendfile(dst_fd, src_fd, None, remaining)
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                        raise
+                    if use_copy_range:
+                        use_copy_range = False  # Cross-device or unsupported: try sendfile
+                        continue
+                    if os.lseek(src_fd, 0, os.SEEK_CUR) == 0:
+                        return False  # Nothing written, let shutil handle it
+                    raise
+                if copied == 0:
+                    # 0 at offset 0 means "unsupported" on some filesystems (FUSE, some CIFS setups)
+                    if remaining == size and use_copy_range:
+                        use_copy_range = False
+                        continue
+                    break  # Unsupported (sendfile too) or source shrank under us
+                remaining -= copied
+            if remaining:
+                logger.warning(f"In-kernel copy stopped with {remaining} of {size} bytes left: {source}")
+                return False  # Partial dest; the next method truncates it
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_DONTNEED)  # See _drop_page_cache
+            return True
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def _drop_page_cache(path: str):
+    """
+    Evict a fully-read source file from the page cache (Linux, best effort).
+
+    Source videos are read once and never again, so their pages would only
+    push out the temp copies ffmpeg is about to read. The destination is left
+    cached on purpose for that reason.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _copy_direct(source: str, dest: Path) -> bool:
+    """
+    Copy a large file reading the source with O_DIRECT (Linux).
+
+    Reads go into a page-aligned anonymous mmap buffer in DIRECT_IO_CHUNK
+    pieces; the first short read marks EOF (or an unaligned tail the filesystem
+    won't serve directly), and whatever is left is read through the page cache.
+
+    Returns:
+        True if copied, False if the filesystem refuses O_DIRECT (nothing written)
+
+    Raises:
+        OSError: On real I/O errors
+    """
+    if not hasattr(os, "O_DIRECT"):
+        return False
+    try:
+        src_fd = os.open(source, os.O_RDONLY | os.O_DIRECT | os.O_CLOEXEC)
+    except OSError as e:
+        if e.errno == errno.EINVAL:
+            return False  # e.g. CIFS with cache=strict, tmpfs
+        raise
+
+    buf = mmap.mmap(-1, DIRECT_IO_CHUNK)  # Anonymous mappings are page-aligned
+    view = memoryview(buf)
+    try:
+        with open(dest, 'wb', buffering=0) as dst:
+            offset = 0
+            while True:
+                try:
+                    n = os.preadv(src_fd, [buf], offset)
+                except OSError as e:
+                    if e.errno == errno.EINVAL and offset == 0:
+                        return False  # Open succeeded but direct reads aren't supported
+                    raise
+                written = 0
+                while written < n:
+                    written += dst.write(view[written:n])
+                offset += n
+                if n < DIRECT_IO_CHUNK:
+                    break
+
+            # Buffered tail: usually empty (the short read above was EOF)
+            with open(source, 'rb', buffering=0) as tail:
+                tail.seek(offset)
+                while n := tail.readinto(buf):
+                    written = 0
+                    while written < n:
+                        written += dst.write(view[written:n])
+        return True
+    finally:
+        view.release()
+        buf.close()
+        os.close(src_fd)
+
+
+def _copy_with_shutil(source: str, dest: Path, size: Optional[int] = None) -> Optional[str]:
+    """Copy file using shutil (cross-platform fallback; O_DIRECT reads for large sources on Linux)"""
     try:
         logger.info(f"Copying with shutil: {source} → {dest}")
         logger.info(f"shutil dest name: {dest.name}")
-        shutil.copy(source, dest)  # copy() not copy2() - no metadata
+        if size is not None and size > DIRECT_IO_THRESHOLD and _copy_direct(source, dest):
+            logger.info("  (O_DIRECT reads)")
+        else:
+            shutil.copyfile(source, dest)  # copyfile() - data only, no permission bits or metadata
+        _drop_page_cache(source)
 
         # Verify the file was created with correct name
         if dest.exists():
@@ -563,12 +1008,14 @@ def _copy_with_shutil(source: str, dest: Path) -> Optional[str]:
 def copy_files_parallel(
     source_files: List[Dict[str, str]],
     dest_dir: str,
-    max_workers: int = 5,
     job_logger: logging.Logger = None,
-    job_id: str = None
+    job_id: str = None,
+    skip_existence_check: bool = False,
+    on_file_copied: Optional[Callable[[str, str], None]] = None
 ) -> Dict[str, Optional[str]]:
     """
-    Copy multiple files in parallel using ThreadPoolExecutor.
+    Copy multiple files in parallel on the shared copy pool
+    (settings.copy_workers threads, COPY_WORKERS env var, default 5).
 
     This provides 3.5x speedup compared to sequential copying when using rsync.
 
@@ -582,7 +1029,9 @@ def copy_files_parallel(
             - 'source_path': Source file path
             - 'dest_filename': Destination filename
         dest_dir: Destination directory (same for all files)
-        max_workers: Number of parallel workers (default: 5, optimal for most cases)
+        skip_existence_check: Skip per-file existence/prefetch checks (only when dest_dir is freshly created)
+        on_file_copied: Called with (dest_filename, dest_path) as each file lands (including
+                        prefetched files), so callers can start work on it before the batch ends
 
     Returns:
         Dict mapping dest_filename to destination path (or None if failed)
@@ -593,22 +1042,81 @@ def copy_files_parallel(
             {'source_path': '\\\\nas\\video2.mp4', 'dest_filename': 'video_002.mp4'},
             {'source_path': '\\\\nas\\video3.mp4', 'dest_filename': 'video_003.mp4'},
         ]
-        results = copy_files_parallel(files, 'temp/job-123', max_workers=5)
+        results = copy_files_parallel(files, 'temp/job-123')
         # Returns: {
         #   'video_001.mp4': 'temp/job-123/video_001.mp4',
         #   'video_002.mp4': 'temp/job-123/video_002.mp4',
         #   'video_003.mp4': None  # Failed to copy
         # }
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
     results = {}
     log = job_logger or logger  # Use job logger if provided, else module logger
 
     if not source_files:
         return results
 
-    log.info(f"Starting parallel copy of {len(source_files)} files with {max_workers} workers")
+    total_count = len(source_files)
+    wall_start, cpu_start = time.monotonic(), time.process_time()
+
+    # Create the destination once for the whole batch, not once per file
+    Path(dest_dir).mkdir(parents=True, exist_ok=True)
+
+    copied_count = 0  # Running count (record_result always runs on the calling thread)
+
+    def record_result(dest_filename, result_path):
+        """Store a finished copy, then update progress and check for cancellation"""
+        nonlocal copied_count
+        results[dest_filename] = result_path
+
+        if result_path:
+            copied_count += 1
+            log.info(f"  ✓ Copied: {dest_filename}")
+            if on_file_copied:
+                on_file_copied(dest_filename, result_path)
+        else:
+            log.error(f"  ✗ Failed: {dest_filename}")
+
+        if job_id:
+            try:
+                from services.supabase import get_supabase_client
+                supabase = get_supabase_client()
+                supabase.table('jobs').update({
+                    'progress_message': f'Copying files... ({copied_count}/{total_count})'
+                }).eq('job_id', job_id).execute()
+                job_status = supabase.table('jobs').select('status').eq('job_id', job_id).execute()
+                if job_status.data and job_status.data[0].get('status') == 'cancelled':
+                    log.warning(f"Job {job_id} cancelled - aborting remaining copies")
+                    raise Exception("Job cancelled by user during file copy")
+            except Exception as e:
+                if "cancelled by user" in str(e).lower():
+                    raise
+                log.debug(f"Progress/cancellation check failed: {e}")
+
+    # Batched copies first, anything they can't handle falls through to per-file copies below
+    use_uring = IS_DOCKER and uring_copy.is_available()
+    use_rsync = IS_DOCKER and _RSYNC_AVAILABLE
+    use_robocopy = not IS_DOCKER and len(source_files) > 1
+    if use_uring or use_rsync or use_robocopy:
+        if not skip_existence_check:
+            source_files = _skip_prefetched(source_files, dest_dir, log, record_result)
+
+        # 1. Docker: every file through one io_uring
+        if source_files and use_uring:
+            source_files = _copy_files_uring(source_files, dest_dir, log, record_result)
+
+        # 2. Docker: one rsync invocation per source share
+        if source_files and use_rsync:
+            source_files = copy_files_batched_rsync(source_files, dest_dir, on_complete=record_result)
+
+        # 3. Windows: one multithreaded robocopy invocation per source folder
+        if source_files and use_robocopy:
+            source_files = copy_files_batched_robocopy(source_files, dest_dir, on_complete=record_result)
+
+        if source_files:
+            log.warning(f"Batched copy left {len(source_files)} files, copying them individually")
+
+    if source_files:
+        log.info(f"Starting parallel copy of {len(source_files)} files with {get_settings().copy_workers} workers")
 
     def copy_single_wrapper(file_info):
         """Wrapper for parallel execution"""
@@ -621,7 +1129,9 @@ def copy_files_parallel(
                 source_path=source_path,
                 dest_dir=dest_dir,
                 dest_filename=dest_filename,
-                use_optimal_method=True
+                use_optimal_method=True,
+                skip_existence_check=skip_existence_check,
+                _skip_mkdir=True
             )
             return dest_filename, result_path
         except Exception as e:
@@ -629,53 +1139,321 @@ def copy_files_parallel(
             return dest_filename, None
 
     # Execute copies in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(copy_single_wrapper, file_info): file_info
-            for file_info in source_files
-        }
+    futures = [_COPY_POOL.submit(copy_single_wrapper, file_info) for file_info in source_files]
 
-        for future in as_completed(futures):
-            dest_filename, result_path = future.result()
-            results[dest_filename] = result_path
-
-            if result_path:
-                log.info(f"  ✓ Copied: {dest_filename}")
-            else:
-                log.error(f"  ✗ Failed: {dest_filename}")
-
-            # Update progress and check for cancellation after each file completes
-            if job_id:
-                try:
-                    from services.supabase import get_supabase_client
-                    supabase = get_supabase_client()
-                    copied_count = sum(1 for v in results.values() if v is not None)
-                    total_count = len(source_files)
-                    supabase.table('jobs').update({
-                        'progress_message': f'Copying files... ({copied_count}/{total_count})'
-                    }).eq('job_id', job_id).execute()
-                    job_status = supabase.table('jobs').select('status').eq('job_id', job_id).execute()
-                    if job_status.data and job_status.data[0].get('status') == 'cancelled':
-                        log.warning(f"Job {job_id} cancelled - aborting remaining copies")
-                        for f in futures:
-                            f.cancel()
-                        raise Exception("Job cancelled by user during file copy")
-                except Exception as e:
-                    if "cancelled by user" in str(e).lower():
-                        raise
-                    log.debug(f"Progress/cancellation check failed: {e}")
+    for future in as_completed(futures):
+        try:
+            record_result(*future.result())
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
 
     # Summary
-    successful = sum(1 for v in results.values() if v is not None)
-    failed = len(results) - successful
-    log.info(f"Parallel copy completed: {successful} succeeded, {failed} failed")
+    failed = len(results) - copied_count
+    wall, cpu = time.monotonic() - wall_start, time.process_time() - cpu_start
+    log.info(f"Parallel copy completed: {copied_count} succeeded, {failed} failed "
+             f"({wall:.1f}s wall, {cpu:.1f}s CPU)")
 
     return results
 
 
+def _skip_prefetched(
+    source_files: List[Dict[str, str]],
+    dest_dir: str,
+    log: logging.Logger,
+    record_result
+) -> List[Dict[str, str]]:
+    """
+    Report files already present in dest_dir with a matching size (prefetched).
+
+    Returns:
+        The subset of source_files that still needs copying
+    """
+    sep = '\\' if dest_dir.startswith('\\\\') else '/'
+    remaining = []
+    for file_info in source_files:
+        dest_file_str = f"{dest_dir}{sep}{file_info['dest_filename']}"
+        try:
+            dest_size = os.stat(dest_file_str).st_size  # Local stat first: most files aren't prefetched
+        except OSError:
+            dest_size = None
+        if dest_size is not None:
+            # Source size comes from the stat cache (already fetched by the existence checks)
+            source_size = _stat_size_cached(normalize_path_for_server(file_info['source_path']))
+            if dest_size == source_size:
+                log.info(f"  Skipping (already exists): {file_info['dest_filename']}")
+                record_result(file_info['dest_filename'], dest_file_str)
+                continue
+        remaining.append(file_info)
+    return remaining
+
+
+def _copy_files_uring(
+    source_files: List[Dict[str, str]],
+    dest_dir: str,
+    log: logging.Logger,
+    record_result
+) -> List[Dict[str, str]]:
+    """
+    Copy files through a single io_uring (see services/uring_copy.py).
+    Each finished file is passed to record_result().
+
+    Returns:
+        The subset of source_files that failed and should be retried
+    """
+    sep = '\\' if dest_dir.startswith('\\\\') else '/'
+    batch = [
+        (file_info, normalize_path_for_server(file_info['source_path']), f"{dest_dir}{sep}{file_info['dest_filename']}")
+        for file_info in source_files
+    ]
+    # Submit in source path order: files of one folder are opened back to back (warm SMB dir cache)
+    batch.sort(key=lambda entry: entry[1])
+
+    log.info(f"Starting io_uring copy of {len(batch)} files")
+    failed = []
+
+    def on_complete(index, success):
+        file_info, _, dest_file_str = batch[index]
+        if success:
+            record_result(file_info['dest_filename'], dest_file_str)
+        else:
+            failed.append(file_info)
+
+    uring_copy.copy_files([(src, dst) for _, src, dst in batch], on_complete=on_complete)
+    return failed
+
+
+def _source_root(normalized_path: str) -> Optional[str]:
+    """Return the Docker mount a path lives under (e.g. /mnt/share4), None if not on a share"""
+    for mount in DOCKER_MOUNTS.values():
+        if normalized_path.startswith(mount + "/"):
+            return mount
+    return None
+
+
+def copy_files_batched_rsync(
+    source_files: List[Dict[str, str]],
+    dest_dir: str,
+    on_complete: Optional[Callable[[str, Optional[str]], None]] = None
+) -> List[Dict[str, str]]:
+    """
+    Copy many files with one rsync invocation per source share (Docker/Linux).
+
+    Relative paths are fed to `rsync --files-from=- --no-relative`, so one process
+    (and one SMB session) handles the whole batch instead of one rsync per file.
+    Files land in a staging dir under their source name and are renamed to their
+    dest_filename as rsync reports each one (--out-format), which keeps
+    per-file progress and lets on_complete abort the batch (e.g. job cancelled).
+
+    Files that can't be batched (not on a known share, or a source name already
+    used in this batch) and files rsync didn't report are returned for a
+    per-file retry.
+
+    Args:
+        source_files: List of dicts with 'source_path' and 'dest_filename'
+        dest_dir: Destination directory (local)
+        on_complete: Optional callback(dest_filename, dest_path) per copied file
+
+    Returns:
+        The subset of source_files that was not copied
+    """
+    staging = Path(dest_dir) / ".rsync-batch"
+    staging.mkdir(parents=True, exist_ok=True)
+
+    # Group by source share; --no-relative flattens names, so each name may appear once
+    groups: Dict[str, Dict[str, Dict[str, str]]] = {}
+    leftovers = []
+    seen_names = set()
+    for file_info in source_files:
+        normalized = normalize_path_for_server(file_info['source_path'])
+        root = _source_root(normalized)
+        name = os.path.basename(normalized)
+        if root is None or name in seen_names:
+            leftovers.append(file_info)
+            continue
+        seen_names.add(name)
+        groups.setdefault(root, {})[normalized[len(root) + 1:]] = file_info
+
+    try:
+        for root, files in groups.items():
+            pending = {os.path.basename(rel): info for rel, info in files.items()}
+            cmd = [
+                "rsync",
+                "--files-from=-",       # Relative paths (from root) on stdin
+                "--no-relative",        # Flatten into the staging dir
+                "--timeout=1200",       # I/O stall timeout
+                "--no-compress",
+                "--whole-file",
+                "--inplace",
+                "--out-format=%b %n",   # One line per file; %b makes rsync log it after the transfer
+                f"{root}/",
+                f"{staging}/"
+            ]
+            logger.info(f"Copying {len(files)} files with one rsync from {root}")
+
+            try:
+                process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            except OSError as e:
+                logger.warning(f"Batched rsync could not start: {e}")
+                leftovers.extend(pending.values())
+                continue
+            try:
+                process.stdin.write("\n".join(sorted(files)).encode() + b"\n")  # Folder by folder
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # rsync exited early - its output below explains why
+
+            try:
+                for raw_line in process.stdout:
+                    line = raw_line.decode(errors='replace').rstrip("\n")
+                    name = line.split(" ", 1)[-1]
+                    file_info = pending.pop(name, None)
+                    if file_info is None:
+                        if line:
+                            logger.warning(f"rsync: {line}")
+                        continue
+                    dest_file_str = f"{dest_dir}/{file_info['dest_filename']}"
+                    try:
+                        os.replace(staging / name, dest_file_str)
+                    except OSError as e:
+                        logger.warning(f"Could not move staged {name} to {dest_file_str}: {e}")
+                        leftovers.append(file_info)
+                        continue
+                    if on_complete:
+                        on_complete(file_info['dest_filename'], dest_file_str)
+            finally:
+                if process.poll() is None:
+                    process.terminate()
+                returncode = process.wait()
+
+            if returncode != 0:
+                logger.warning(f"Batched rsync from {root} exited with code {returncode}")
+            leftovers.extend(pending.values())
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return leftovers
+
+
+ROBOCOPY_BATCH_SIZE = 100  # File names per robocopy invocation (Windows command line limit)
+
+
+def _robocopy_staged_complete(staged: Path, source: str) -> bool:
+    """
+    Check a file robocopy staged before exiting with an error code.
+
+    robocopy preallocates the destination and stamps it 1980-01-01 until the
+    copy finishes, so a partial copy can already have the full size: require
+    both the source size and the source mtime (2s tolerance, FAT resolution).
+    """
+    try:
+        staged_stat = staged.stat()
+        source_stat = os.stat(source)
+    except OSError:
+        return False
+    return (staged_stat.st_size == source_stat.st_size
+            and abs(staged_stat.st_mtime - source_stat.st_mtime) <= 2)
+
+
+def copy_files_batched_robocopy(
+    source_files: List[Dict[str, str]],
+    dest_dir: str,
+    on_complete: Optional[Callable[[str, Optional[str]], None]] = None
+) -> List[Dict[str, str]]:
+    """
+    Copy many files with one robocopy invocation per source folder (Windows).
+
+    robocopy takes a list of file names after the source/dest folders, so each
+    folder is copied by one process with /MT:16 (multithreaded, one SMB session)
+    instead of one robocopy per file. Files land in a staging dir under their
+    source name and are renamed to their dest_filename afterwards.
+
+    Files whose source name is already used in this batch, and files robocopy
+    didn't produce, are returned for a per-file retry.
+
+    Args:
+        source_files: List of dicts with 'source_path' and 'dest_filename'
+        dest_dir: Destination directory (local)
+        on_complete: Optional callback(dest_filename, dest_path) per copied file
+
+    Returns:
+        The subset of source_files that was not copied
+    """
+    staging = Path(dest_dir) / ".robocopy-batch"
+    staging.mkdir(parents=True, exist_ok=True)
+    sep = '\\' if dest_dir.startswith('\\\\') else '/'
+
+    # Group by source folder; the staging dir is flat, so each name may appear once
+    groups: Dict[str, Dict[str, Dict[str, str]]] = {}
+    leftovers = []
+    seen_names = set()
+    for file_info in source_files:
+        source_dir, name = os.path.split(normalize_path_for_server(file_info['source_path']))
+        if name in seen_names:
+            leftovers.append(file_info)
+            continue
+        seen_names.add(name)
+        groups.setdefault(source_dir, {})[name] = file_info
+
+    try:
+        for source_dir, files in groups.items():
+            names = list(files)
+            for start in range(0, len(names), ROBOCOPY_BATCH_SIZE):
+                chunk = names[start:start + ROBOCOPY_BATCH_SIZE]
+                cmd = [
+                    "robocopy",
+                    source_dir,
+                    str(staging),
+                    *chunk,
+                    "/MT:16",    # Multithreaded copy
+                    "/R:3",      # Retry 3 times on failure
+                    "/W:5",      # Wait 5 seconds between retries
+                    "/NP",       # No progress (less verbose)
+                    "/NFL",      # No file list
+                    "/NDL",      # No directory list
+                    "/NJH",      # No job header
+                    "/NJS",      # No job summary
+                ]
+                logger.info(f"Copying {len(chunk)} files with one robocopy from {source_dir}")
+
+                try:
+                    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                            timeout=300 * len(chunk))
+                except (OSError, subprocess.TimeoutExpired) as e:
+                    logger.warning(f"Batched robocopy from {source_dir} failed: {e}")
+                    leftovers.extend(files[name] for name in chunk)
+                    continue
+
+                # Robocopy exit codes: 0-7 are success, 8+ are errors (some files may still be copied)
+                failed = result.returncode >= 8
+                if failed:
+                    logger.warning(f"Batched robocopy from {source_dir} exited with code {result.returncode}: "
+                                   f"{_stderr_tail(result.stderr)}")
+
+                for name in chunk:
+                    file_info = files[name]
+                    dest_file_str = f"{dest_dir}{sep}{file_info['dest_filename']}"
+                    # After an error a staged file may be a partial copy: only keep verified ones
+                    if failed and not _robocopy_staged_complete(staging / name, os.path.join(source_dir, name)):
+                        leftovers.append(file_info)
+                        continue
+                    try:
+                        os.replace(staging / name, dest_file_str)
+                    except OSError:
+                        leftovers.append(file_info)
+                        continue
+                    if on_complete:
+                        on_complete(file_info['dest_filename'], dest_file_str)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return leftovers
+
+
 def normalize_path_for_server(path: str) -> str:
     """
-    Normalize a single path (wrapper for normalize_paths that returns single path).
+    Normalize a single path (same rules as normalize_paths, without the list round-trip).
 
     Args:
         path: Path in any format
@@ -683,7 +1461,7 @@ def normalize_path_for_server(path: str) -> str:
     Returns:
         Normalized path (UNC on Windows, Docker mount on Linux)
     """
-    return normalize_paths([path])[0]
+    return _normalize_one(path) if path else path
 
 
 def convert_path_for_client(path: str, client_os: str = "windows") -> str:
@@ -786,6 +1564,9 @@ def copy_file_to_output(temp_path: str, filename: str, username: str = None) ->
 
     Example: \\\\192.168.1.6\\Share3\\Public\\video-compilation\\username\\channel_jobid.mp4
 
+    When temp and output live on the same filesystem the file is renamed (or
+    hard-linked) instead of copied, so temp_path may no longer exist afterwards.
+
     Args:
         temp_path: Path to file in temp directory
         filename: Output filename
@@ -813,7 +1594,13 @@ def copy_file_to_output(temp_path: str, filename: str, username: str = None) ->
     # Create directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    result = copy_file_sequential(temp_path, output_dir, filename)
+    # Same filesystem as the temp dir: move the file (metadata only) instead of copying bytes
+    sep = '\\' if output_dir.startswith('\\\\') else '/'
+    final_path = f"{output_dir}{sep}{filename}"
+    if _move_within_device(temp_path, output_dir, final_path):
+        result = final_path
+    else:
+        result = copy_file_sequential(temp_path, output_dir, filename, _skip_mkdir=True)
 
     if not result:
         raise Exception(f"Failed to copy file to output: {temp_path}")
@@ -822,25 +1609,98 @@ def copy_file_to_output(temp_path: str, filename: str, username: str = None) ->
     if result.startswith('\\\\'):
         result = result.replace('/', '\\')
 
+    # The output may overwrite a file whose stat is still cached
+    invalidate_exists(result)
+
     return result
 
 
+def _move_within_device(source: str, dest_dir: str, dest: str) -> bool:
+    """
+    Move source to dest with rename(), else link(), if both are on one filesystem.
+
+    Returns:
+        True if dest now holds the file, False if the caller has to copy it
+    """
+    try:
+        if os.stat(source).st_dev != os.stat(dest_dir).st_dev:
+            return False
+    except OSError:
+        return False
+
+    try:
+        os.replace(source, dest)
+        logger.info(f"✓ Moved (same filesystem): {source} → {dest}")
+        return True
+    except OSError as e:
+        logger.debug(f"rename failed ({e}), trying hard link")
+    try:
+        os.link(source, dest)
+        logger.info(f"✓ Hard-linked (same filesystem): {source} → {dest}")
+        return True
+    except OSError as e:
+        logger.debug(f"hard link failed ({e}), copying instead")
+        return False
+
+
 def cleanup_temp_dir(job_id: str):
     """
-    Clean up temp directory for a job.
+    Clean up temp directory for a job (in the background).
     Includes video files, logo files, and ASS subtitle files.
 
+    The directory is renamed out of the way first (O(1), so a retry of the same
+    job gets a fresh dir), then deleted on _CLEANUP_POOL - the caller doesn't
+    wait for gigabytes of intermediate files to be unlinked.
+
     Args:
         job_id: Job UUID
     """
     settings = get_settings()
     temp_dir = Path(settings.temp_dir) / str(job_id)
 
-    if temp_dir.exists():
-        try:
-            shutil.rmtree(temp_dir)
-            logger.info(f"✓ Cleaned up temp dir: {temp_dir}")
-        except Exception as e:
-            logger.error(f"✗ Failed to clean up {temp_dir}: {e}", exc_info=True)
-    else:
+    invalidate_exists(str(temp_dir))
+    if not temp_dir.exists():
         logger.debug(f"Temp dir doesn't exist (already cleaned?): {temp_dir}")
+        return
+
+    doomed = temp_dir.with_name(f".deleting-{temp_dir.name}-{time.monotonic_ns()}")
+    try:
+        temp_dir.rename(doomed)
+    except OSError:
+        doomed = temp_dir  # e.g. a file still open on Windows - delete in place
+
+    _CLEANUP_POOL.submit(_remove_tree_logged, doomed, temp_dir)
+
+
+def _remove_tree_logged(root: Path, temp_dir: Path):
+    """Run _remove_tree on the cleanup pool, logging the outcome (nobody waits on the future)"""
+    try:
+        _remove_tree(root)
+        logger.info(f"✓ Cleaned up temp dir: {temp_dir}")
+    except Exception as e:
+        logger.error(f"✗ Failed to clean up {temp_dir}: {e}", exc_info=True)
+
+
+def _remove_tree(root: Path):
+    """
+    Delete a directory tree, unlinking files in parallel.
+
+    Small trees (< PARALLEL_UNLINK_MIN_FILES files) use shutil.rmtree - the thread
+    hop isn't worth it. Otherwise files are unlinked on _CHECK_POOL (not the copy
+    pool, where unlinks would queue behind in-flight prefetch copies), then the
+    directories are removed bottom-up.
+    """
+    files = []
+    dirs = []
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        files.extend(os.path.join(dirpath, name) for name in filenames)
+        dirs.append(dirpath)
+
+    if len(files) < PARALLEL_UNLINK_MIN_FILES:
+        shutil.rmtree(root)
+        return
+
+    # list() waits for every unlink and re-raises the first failure
+    list(_CHECK_POOL.map(os.unlink, files))
+    for dirpath in dirs:  # bottom-up (children before parents)
+        os.rmdir(dirpath)
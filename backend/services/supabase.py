@@ -1,9 +1,142 @@
-from supabase import create_client, Client
+import httpx
+import threading
+from supabase import create_client, Client, ClientOptions
 from api.config import get_settings
 from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Optional: psycopg2 (pip install psycopg2-binary) + settings.supabase_db_url send the
+# hottest writes (encode progress) straight to Postgres via the Supavisor pooler,
+# skipping PostgREST/HTTPS. Without them everything goes through the REST client.
+try:
+    from psycopg2.pool import ThreadedConnectionPool
+except ImportError:
+    ThreadedConnectionPool = None
+
+# Shared HTTP/2 connection pool: one TLS handshake per process, not per request
+_HTTP_CLIENT = None
+
+# Direct Postgres connections (created on first use)
+PG_POOL_MIN_CONNECTIONS = 1
+PG_POOL_MAX_CONNECTIONS = 10
+_PG_POOL = None
+_PG_POOL_LOCK = threading.Lock()
 
 @lru_cache()
 def get_supabase_client() -> Client:
-    """Get Supabase client (cached)"""
+    """Get Supabase client (cached, pooled keep-alive connections)"""
+    global _HTTP_CLIENT
     settings = get_settings()
-    return create_client(settings.supabase_url, settings.supabase_key)
+    _HTTP_CLIENT = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60.0),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    )
+    return create_client(
+        settings.supabase_url,
+        settings.supabase_key,
+        options=ClientOptions(httpx_client=_HTTP_CLIENT),
+    )
+
+def close_supabase_client():
+    """Close the pooled connections (call at shutdown)"""
+    global _HTTP_CLIENT, _PG_POOL
+    get_supabase_client.cache_clear()
+    if _HTTP_CLIENT is not None:
+        _HTTP_CLIENT.close()
+        _HTTP_CLIENT = None
+    with _PG_POOL_LOCK:
+        if _PG_POOL:
+            _PG_POOL.closeall()
+        _PG_POOL = None
+
+def get_pg_pool() -> Optional["ThreadedConnectionPool"]:
+    """Direct Postgres connection pool, None if psycopg2 or settings.supabase_db_url is missing"""
+    global _PG_POOL
+    if _PG_POOL is None:
+        with _PG_POOL_LOCK:
+            if _PG_POOL is None:
+                db_url = get_settings().supabase_db_url
+                _PG_POOL = False  # Also if connecting fails below: don't retry on every call
+                if ThreadedConnectionPool is not None and db_url:
+                    _PG_POOL = ThreadedConnectionPool(PG_POOL_MIN_CONNECTIONS, PG_POOL_MAX_CONNECTIONS, db_url)
+    return _PG_POOL or None
+
+def pg_update_job_progress(job_id: str, progress: int) -> Optional[bool]:
+    """
+    Set a job's progress (and status 'processing') over the direct Postgres pool.
+
+    Cancelled jobs are left untouched, same as the progress PATCH.
+
+    Returns:
+        True if the job was updated, False if it's cancelled (or gone),
+        None if no direct connection is configured (use patch_rows instead)
+
+    Raises:
+        psycopg2.Error: On connection or query errors
+    """
+    pool = get_pg_pool()
+    if pool is None:
+        return None
+    conn = pool.getconn()
+    try:
+        with conn, conn.cursor() as cur:  # Commits on success, rolls back on error
+            cur.execute(
+                "UPDATE jobs SET progress = %s, status = 'processing' "
+                "WHERE job_id = %s AND status IS DISTINCT FROM 'cancelled'",
+                (progress, job_id)
+            )
+            return cur.rowcount > 0
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))  # Drop connections the server closed
+
+@lru_cache()
+def _rest_headers(prefer: str) -> Dict[str, str]:
+    """PostgREST auth headers for direct requests (same key as the client)"""
+    key = get_settings().supabase_key
+    return {
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
+        "Prefer": prefer,
+    }
+
+def patch_rows(
+    table: str,
+    match: Dict[str, str],
+    values: Dict,
+    exclude: Optional[Dict[str, str]] = None,
+    returning: Optional[str] = None
+) -> Optional[List[Dict]]:
+    """
+    Update rows with one PATCH on the pooled connection, bypassing the query builder.
+
+    For hot paths that fire many small updates (e.g. encode progress).
+    Equivalent to table(table).update(values).eq(column, value)... for each match
+    item. Each exclude item keeps rows where the column IS DISTINCT FROM value
+    (NULLs included, unlike a plain neq - same as pg_update_job_progress).
+
+    Args:
+        returning: Columns to return from the updated rows (e.g. "status"),
+                   so a read can ride on the same round-trip
+
+    Returns:
+        Updated rows (only the returning columns) if returning is set, else None
+
+    Raises:
+        httpx.HTTPError: On connection errors or a non-2xx response
+    """
+    get_supabase_client()  # Creates the pooled _HTTP_CLIENT on first use
+    params = {column: f"eq.{value}" for column, value in match.items()}
+    distinct = [f"or({column}.is.null,{column}.neq.{value})" for column, value in (exclude or {}).items()]
+    if distinct:
+        params["and"] = f"({','.join(distinct)})"
+    if returning:
+        params["select"] = returning
+    response = _HTTP_CLIENT.patch(
+        f"{get_settings().supabase_url}/rest/v1/{table}",
+        params=params,
+        json=values,
+        headers=_rest_headers("return=representation" if returning else "return=minimal"),
+    )
+    response.raise_for_status()
+    return response.json() if returning else None
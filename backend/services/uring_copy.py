@@ -0,0 +1,347 @@
+"""
+Batched multi-file copy over a single io_uring (Linux 5.6+).
+
+Instead of forking one rsync process per file, every chunk of every file is
+queued as a linked READ -> WRITE pair on one shared ring, so a single
+io_uring_enter() submits work for many files at once and the kernel keeps
+the source share and the temp disk busy in parallel. stat_paths() and
+statx_paths() use the same ring to batch STATX existence/size checks.
+
+Dependency: the `liburing` Python binding, pinned in requirements.txt (its API
+changes between releases). When it is missing, the kernel is older than 5.6,
+or io_uring is blocked (Docker's default seccomp profile denies it),
+is_available() returns False and callers use the regular rsync/cp/shutil path.
+"""
+import os
+import logging
+import platform
+import threading
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+RING_ENTRIES = 256                      # SQ size
+SUBMIT_BATCH = RING_ENTRIES // 2        # Submit once the SQ is half full
+CHUNK_SIZE = 1024 * 1024                # 1 MiB per READ/WRITE pair
+BUFFER_POOL_SIZE = 64                   # In-flight chunks (64 MiB of buffers)
+MIN_KERNEL = (5, 6)                     # IORING_OP_READ / IORING_OP_WRITE / IORING_OP_STATX
+PART_SUFFIX = ".part"                   # Files are written here and renamed when complete
+
+_AVAILABLE = None
+
+
+def _kernel_version() -> Tuple[int, int]:
+    """Return (major, minor) of the running kernel, (0, 0) if unparseable"""
+    try:
+        major, minor = platform.release().split(".")[:2]
+        return int(major), int("".join(c for c in minor if c.isdigit()) or 0)
+    except ValueError:
+        return 0, 0
+
+
+def _ring_works() -> bool:
+    """Set up and tear down a small ring (fails where seccomp blocks io_uring_setup)"""
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(2, ring, 0)
+    except Exception as e:
+        logger.info(f"io_uring setup failed: {e}")
+        return False
+    liburing.io_uring_queue_exit(ring)
+    return True
+
+
+def is_available() -> bool:
+    """Check if io_uring copies can be used on this host (cached)"""
+    global _AVAILABLE
+    if _AVAILABLE is None:
+        _AVAILABLE = (
+            liburing is not None
+            and platform.system() == "Linux"
+            and _kernel_version() >= MIN_KERNEL
+            and _ring_works()
+        )
+        logger.info(f"io_uring copy available: {_AVAILABLE}")
+    return _AVAILABLE
+
+
+def _reap(ring, cqe) -> Tuple[int, int]:
+    """Wait for one completion and return (res, user_data); res < 0 on error"""
+    liburing.io_uring_wait_cqe(ring, cqe)
+    entry = cqe[0]
+    user_data = entry.user_data
+    try:
+        res = entry.res
+    except OSError as e:
+        # The binding raises for negative results (-errno)
+        res = -(e.errno or 1)
+    liburing.io_uring_cqe_seen(ring, entry)
+    return res, user_data
+
+
+class _FileState:
+    """Per-file bookkeeping while its chunks are in flight"""
+
+    __slots__ = ("index", "dest", "part_path", "src_fd", "dst_fd", "size",
+                 "next_offset", "pending", "failed")
+
+    def __init__(self, index: int, source: str, dest: str):
+        self.index = index
+        self.dest = dest
+        # Chunks land out of order; dest only appears once every chunk is written.
+        # pid/thread in the name: a prefetch copying the same file never shares the .part
+        self.part_path = f"{dest}.{os.getpid()}.{threading.get_ident()}{PART_SUFFIX}"
+        self.src_fd = -1
+        self.dst_fd = -1
+        self.next_offset = 0
+        self.pending = 0
+        self.failed = False
+
+        self.size = os.stat(source).st_size
+        self.src_fd = os.open(source, os.O_RDONLY)
+        try:
+            self.dst_fd = os.open(self.part_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        except OSError:
+            self.close()
+            raise
+
+    @property
+    def exhausted(self) -> bool:
+        return self.next_offset >= self.size
+
+    def close(self):
+        for fd in (self.src_fd, self.dst_fd):
+            if fd >= 0:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.src_fd = self.dst_fd = -1
+
+    def commit(self) -> bool:
+        """Close the file and move the .part into place, or delete it if the copy failed"""
+        self.close()
+        if not self.failed:
+            try:
+                os.replace(self.part_path, self.dest)
+                return True
+            except OSError as e:
+                logger.warning(f"io_uring rename failed for {self.dest}: {e}")
+                self.failed = True
+        self.discard()
+        return False
+
+    def discard(self):
+        """Close the file and delete the partial copy"""
+        self.close()
+        try:
+            os.unlink(self.part_path)
+        except OSError:
+            pass
+
+
+def copy_files(
+    pairs: List[Tuple[str, str]],
+    on_complete: Optional[Callable[[int, bool], None]] = None
+) -> List[bool]:
+    """
+    Copy many files through one io_uring.
+
+    Each file is split into CHUNK_SIZE pieces; every piece is a READ linked
+    (IOSQE_IO_LINK) to the WRITE that consumes it, so the kernel runs the pair
+    in order without a round-trip through Python. In-flight chunks are bounded
+    by the buffer pool, and the SQ is flushed whenever it reaches half capacity.
+    SQPOLL is deliberately not used (it pins a CPU core per ring).
+
+    Chunks complete out of order, so each file is written to a private
+    <dest>.<pid>.<thread>.part and renamed to dest only once all of its chunks
+    succeeded. An interrupted batch never leaves a full-size destination with
+    holes in it.
+
+    Args:
+        pairs: List of (source_path, dest_path) tuples (paths already normalized)
+        on_complete: Optional callback(index, success) fired as each file finishes.
+                     Exceptions raised by the callback abort the batch.
+
+    Returns:
+        List of success flags, one per input pair
+    """
+    results = [False] * len(pairs)
+    if not pairs:
+        return results
+
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(RING_ENTRIES, ring, 0)
+
+    # The binding reads/writes len(buf) bytes, so a file's last (short) chunk
+    # gets its own exact-size buffer instead of a pool buffer
+    buffers = [bytearray(CHUNK_SIZE) for _ in range(BUFFER_POOL_SIZE)]
+    free_slots = list(range(BUFFER_POOL_SIZE))
+    slot_owner = {}  # slot -> (file state, chunk length, buffer)
+    files = iter(enumerate(pairs))
+    current = None
+    active = 0       # files opened but not yet finished
+    queued = 0       # SQEs prepared since the last submit
+    inflight = 0     # CQEs still expected from the kernel
+
+    def finish(state: _FileState):
+        nonlocal active
+        success = state.commit()
+        active -= 1
+        results[state.index] = success
+        if on_complete:
+            on_complete(state.index, success)
+
+    def next_file() -> Optional[_FileState]:
+        nonlocal active
+        for index, (source, dest) in files:
+            try:
+                state = _FileState(index, source, dest)
+            except OSError as e:
+                logger.warning(f"io_uring open failed for {source}: {e}")
+                if on_complete:
+                    on_complete(index, False)
+                continue
+            active += 1
+            if state.size == 0:
+                finish(state)
+                continue
+            return state
+        return None
+
+    try:
+        current = next_file()
+        while current is not None or active:
+            # Fill the ring while there are free buffers and chunks left to queue
+            while current is not None and free_slots:
+                slot = free_slots.pop()
+                offset = current.next_offset
+                length = min(CHUNK_SIZE, current.size - offset)
+                buf = buffers[slot] if length == CHUNK_SIZE else bytearray(length)
+
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_read(sqe, current.src_fd, buf, offset)
+                liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_IO_LINK)
+                liburing.io_uring_sqe_set_data64(sqe, slot << 1)
+
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_write(sqe, current.dst_fd, buf, offset)
+                liburing.io_uring_sqe_set_data64(sqe, (slot << 1) | 1)
+
+                slot_owner[slot] = (current, length, buf)
+                current.next_offset += length
+                current.pending += 1
+                queued += 2
+                inflight += 2
+
+                if queued >= SUBMIT_BATCH:
+                    liburing.io_uring_submit(ring)
+                    queued = 0
+                if current.exhausted:
+                    current = next_file()
+
+            if queued:
+                liburing.io_uring_submit(ring)
+                queued = 0
+            if not inflight:
+                continue
+
+            # Reap one completion (blocks until the kernel posts it)
+            res, data = _reap(ring, cqe)
+            inflight -= 1
+
+            slot, is_write = data >> 1, data & 1
+            state, length, _ = slot_owner[slot]
+            if res != length:
+                # Short read breaks the link: the paired WRITE completes with -ECANCELED
+                state.failed = True
+            if not is_write:
+                continue
+
+            del slot_owner[slot]
+            free_slots.append(slot)
+            state.pending -= 1
+            if state.failed and state is current:
+                current = next_file()
+            if state.pending == 0 and (state.exhausted or state.failed):
+                finish(state)
+
+    finally:
+        # Never release buffers the kernel may still be writing into
+        if queued:
+            liburing.io_uring_submit(ring)
+        while inflight:
+            _reap(ring, cqe)
+            inflight -= 1
+        # Files still in flight (batch aborted) never reach their destination
+        for state, _, _ in slot_owner.values():
+            state.discard()
+        if current is not None:
+            current.discard()
+        liburing.io_uring_queue_exit(ring)
+
+    return results
+
+
+def stat_paths(paths: List[str]) -> List[bool]:
+    """
+    Check existence of many paths with batched IORING_OP_STATX (see statx_paths).
+
+    Args:
+        paths: List of normalized paths
+
+    Returns:
+        List of existence flags, one per input path
+    """
+    return [st is not None for st in statx_paths(paths)]
+
+
+def statx_paths(paths: List[str]) -> List[Optional[Tuple[int, int]]]:
+    """
+    Stat many paths with batched IORING_OP_STATX.
+
+    Every path gets one STATX SQE flagged IOSQE_ASYNC (so a slow SMB stat is
+    punted to a kernel worker instead of blocking submission), and the whole
+    batch goes out in one io_uring_submit_and_wait() per RING_ENTRIES paths.
+
+    Args:
+        paths: List of normalized paths
+
+    Returns:
+        (size, mtime_ns) per input path, None where the stat failed. The binding
+        exposes mtime as float seconds, so mtime_ns is only accurate to ~1us.
+    """
+    results: List[Optional[Tuple[int, int]]] = [None] * len(paths)
+    if not paths:
+        return results
+
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(min(len(paths), RING_ENTRIES), ring, 0)
+    try:
+        for start in range(0, len(paths), RING_ENTRIES):
+            batch = paths[start:start + RING_ENTRIES]
+            # Keep buffers alive until their CQEs are reaped
+            bufs = [liburing.Statx() for _ in batch]
+            for i, (path, buf) in enumerate(zip(batch, bufs)):
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_statx(sqe, buf, path, 0, liburing.STATX_BASIC_STATS)
+                liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_ASYNC)
+                liburing.io_uring_sqe_set_data64(sqe, start + i)
+
+            liburing.io_uring_submit_and_wait(ring, len(batch))
+            for _ in batch:
+                res, index = _reap(ring, cqe)
+                if res == 0:
+                    buf = bufs[index - start]
+                    results[index] = (buf.size, round(buf.mtime * 1_000_000_000))
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+    return results
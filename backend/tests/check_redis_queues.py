@@ -5,10 +5,17 @@ Run: python tests/check_redis_queues.py
 import redis
 import json
 import os
+from itertools import islice
 
 # Standalone - no project imports needed
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 
+# Keys sampled with SCAN for the listing (sorted, first 20 shown)
+KEY_SAMPLE_SIZE = 500
+
+# Tasks listed per queue (only these are fetched, LLEN gives the total)
+QUEUE_PREVIEW_SIZE = 3
+
 # Task IDs from the stuck jobs (hardcoded for quick check)
 STUCK_TASK_IDS = [
     ("a8637c4f-beba-4c55-8429-bb2b7890f6fa", "d57c3cef-48ac-4722-bc25-df87e4589032", "Kidscamp Bahasa"),
@@ -42,41 +49,62 @@ def check_redis_queues():
 
     # List all keys
     print("--- All Keys in Redis ---")
-    all_keys = r.keys("*")
-    print(f"  Total keys: {len(all_keys)}")
-    for key in sorted([k.decode() for k in all_keys])[:20]:
-        key_type = r.type(key).decode()
+    # DBSIZE for the total, SCAN (non-blocking, bounded sample) instead of KEYS "*"
+    total_keys = r.dbsize()
+    print(f"  Total keys: {total_keys}")
+    sampled_keys = islice(r.scan_iter(match='*', count=1000), KEY_SAMPLE_SIZE)
+    shown_keys = sorted(k.decode() for k in sampled_keys)[:20]
+
+    # One round-trip for every TYPE, then one for every LLEN/SCARD
+    pipe = r.pipeline(transaction=False)
+    for key in shown_keys:
+        pipe.type(key)
+    key_types = [t.decode() for t in pipe.execute()]
+
+    pipe = r.pipeline(transaction=False)
+    for key, key_type in zip(shown_keys, key_types):
         if key_type == 'list':
-            length = r.llen(key)
-            print(f"  {key} (list, {length} items)")
+            pipe.llen(key)
         elif key_type == 'set':
-            length = r.scard(key)
-            print(f"  {key} (set, {length} items)")
+            pipe.scard(key)
+    lengths = iter(pipe.execute())
+
+    for key, key_type in zip(shown_keys, key_types):
+        if key_type == 'list':
+            print(f"  {key} (list, {next(lengths)} items)")
+        elif key_type == 'set':
+            print(f"  {key} (set, {next(lengths)} items)")
         elif key_type == 'string':
             print(f"  {key} (string)")
         else:
             print(f"  {key} ({key_type})")
-    if len(all_keys) > 20:
-        print(f"  ... and {len(all_keys) - 20} more keys")
+    if total_keys > len(shown_keys):
+        print(f"  ... and {total_keys - len(shown_keys)} more keys")
 
     print()
 
     # Check specific queues
     queues = ['default_queue', 'gpu_queue', '4k_queue', 'celery']
     print("--- Queue Lengths ---")
+    # Lengths plus the first QUEUE_PREVIEW_SIZE tasks of each queue in one round-trip
+    pipe = r.pipeline(transaction=False)
+    for queue in queues:
+        pipe.llen(queue)
+        pipe.lrange(queue, 0, QUEUE_PREVIEW_SIZE - 1)
+    replies = pipe.execute()
+    queue_lengths = dict(zip(queues, replies[0::2]))
+    queue_previews = dict(zip(queues, replies[1::2]))
     for queue in queues:
-        length = r.llen(queue)
-        print(f"  {queue}: {length} tasks")
+        print(f"  {queue}: {queue_lengths[queue]} tasks")
 
     print()
 
     # Check stuck task IDs
     print("--- Stuck Task Status ---")
-    for job_id, task_id, channel in STUCK_TASK_IDS:
-        task_key = f"celery-task-meta-{task_id}"
-        exists = r.exists(task_key)
-        if exists:
-            data = r.get(task_key)
+    # One MGET for every task result (missing keys come back as None)
+    task_results = r.mget([f"celery-task-meta-{task_id}" for _, task_id, _ in STUCK_TASK_IDS])
+    for (job_id, task_id, channel), data in zip(STUCK_TASK_IDS, task_results):
+        if data is not None:
             try:
                 parsed = json.loads(data)
                 status = parsed.get('status', 'unknown')
@@ -91,10 +119,10 @@ def check_redis_queues():
     # Check if tasks are in any queue
     print("--- Tasks in Queues ---")
     for queue in queues:
-        tasks = r.lrange(queue, 0, -1)
+        tasks = queue_previews[queue]
         if tasks:
             print(f"  {queue}:")
-            for task_data in tasks[:3]:
+            for task_data in tasks:
                 try:
                     task = json.loads(task_data)
                     headers = task.get('headers', {})
@@ -102,8 +130,8 @@ def check_redis_queues():
                     print(f"    - {task_id}")
                 except:
                     print(f"    - (cannot parse)")
-            if len(tasks) > 3:
-                print(f"    ... and {len(tasks) - 3} more")
+            if queue_lengths[queue] > len(tasks):
+                print(f"    ... and {queue_lengths[queue] - len(tasks)} more")
 
     print()
     print("=" * 60)
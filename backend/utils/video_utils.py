@@ -1,17 +1,204 @@
+import os
 import subprocess
 import json
 import logging
+import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Optional, Dict, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from api.config import get_settings
+from services import uring_copy
 
 logger = logging.getLogger(__name__)
 
+# Optional: PyAV (pip install av) probes in-process via libavformat - no ffprobe fork per file.
+# Without it, get_video_info uses the ffprobe subprocess.
+try:
+    import av
+except ImportError:
+    av = None
+
+# Upper bound on parallel ffprobe processes (max_workers is a query parameter on some endpoints)
+MAX_FFPROBE_WORKERS = 16
+
+# Probe results are reused for two weeks as long as the file's size and mtime are unchanged
+PROBE_CACHE_TTL = 14 * 24 * 3600  # seconds
+# mtime match tolerance: io_uring stats (uring_copy.statx_paths) only carry ~1us precision
+PROBE_CACHE_MTIME_TOLERANCE_NS = 1000
+_probe_cache_local = threading.local()  # sqlite connections can't be shared across threads
+_probe_cache_pruned = False  # Expired rows are deleted once per process, not per connection
+_probe_cache_prune_lock = threading.Lock()
+
+
+@lru_cache()
+def _temp_root() -> str:
+    """Absolute settings.temp_dir, with a trailing separator"""
+    return os.path.join(os.path.abspath(get_settings().temp_dir), "")
+
+
+def _probe_cacheable(video_path: str) -> bool:
+    """
+    Per-job copies under settings.temp_dir are never cached: their paths are
+    unique to the job and the copy gets a fresh mtime, so they can't hit again.
+    """
+    return not os.path.abspath(video_path).startswith(_temp_root())
+
+
+def _probe_cache() -> Optional[sqlite3.Connection]:
+    """Open (once per thread) the sqlite probe cache, None if disabled or unusable"""
+    conn = getattr(_probe_cache_local, "conn", None)
+    if conn is None:
+        conn = False
+        cache_path = get_settings().probe_cache_path
+        if cache_path:
+            try:
+                Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(cache_path, timeout=5)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS probes ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, info TEXT, probed_at REAL)"
+                )
+                _prune_probe_cache(conn)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"ffprobe cache disabled ({cache_path}): {e}")
+                conn = False
+        _probe_cache_local.conn = conn
+    return conn or None
+
+
+def _prune_probe_cache(conn: sqlite3.Connection):
+    """Delete expired probes (first connection of the process only)"""
+    global _probe_cache_pruned
+    with _probe_cache_prune_lock:
+        if _probe_cache_pruned:
+            return
+        conn.execute("DELETE FROM probes WHERE probed_at < ?", (time.time() - PROBE_CACHE_TTL,))
+        conn.commit()
+        _probe_cache_pruned = True
+
+
+def _probe_cache_get(video_path: str, size: int, mtime_ns: int) -> Optional[Dict]:
+    """Return cached video info if the file is unchanged since it was probed"""
+    if not _probe_cacheable(video_path):
+        return None
+    conn = _probe_cache()
+    if conn is None:
+        return None
+    try:
+        row = conn.execute(
+            "SELECT info FROM probes WHERE path = ? AND size = ? AND mtime_ns BETWEEN ? AND ? AND probed_at >= ?",
+            (video_path, size, mtime_ns - PROBE_CACHE_MTIME_TOLERANCE_NS,
+             mtime_ns + PROBE_CACHE_MTIME_TOLERANCE_NS, time.time() - PROBE_CACHE_TTL)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.debug(f"ffprobe cache read failed: {e}")
+        return None
+    if not row:
+        return None
+    info = json.loads(row[0])
+    # Entries from before the current set of stream details was probed are re-probed once
+    return info if 'video_profile' in info else None
+
+
+def _probe_cache_put(video_path: str, size: int, mtime_ns: int, info: Dict):
+    """Store a successful probe"""
+    if not _probe_cacheable(video_path):
+        return
+    conn = _probe_cache()
+    if conn is None:
+        return
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO probes (path, size, mtime_ns, info, probed_at) VALUES (?, ?, ?, ?, ?)",
+            (video_path, size, mtime_ns, json.dumps(info), time.time())
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        logger.debug(f"ffprobe cache write failed: {e}")
+
+
+def _get_video_info_pyav(video_path: str) -> Optional[Dict]:
+    """
+    Probe duration and resolution in-process with PyAV (same fields as get_video_info).
+
+    Returns:
+        Video info dict, or None if the file can't be opened/parsed (caller falls back to ffprobe)
+    """
+    try:
+        with av.open(video_path, metadata_errors='ignore') as container:
+            if container.duration is None or not container.streams.video:
+                return None
+            video_stream = container.streams.video[0]
+            codec_context = video_stream.codec_context
+            width, height = codec_context.width, codec_context.height
+            duration = container.duration / av.time_base  # microseconds -> seconds
+            sar = codec_context.sample_aspect_ratio
+            time_base = video_stream.time_base
+            stream_info = {
+                "video_codec": codec_context.name,
+                "video_profile": codec_context.profile,
+                "video_level": _avcc_level(codec_context.extradata),
+                "video_bit_rate": codec_context.bit_rate or None,
+                "pix_fmt": codec_context.pix_fmt,
+                "sar": f"{sar.numerator}:{sar.denominator}" if sar else None,
+                "time_base": f"{time_base.numerator}/{time_base.denominator}" if time_base else None,
+                "fps": float(video_stream.average_rate) if video_stream.average_rate else None,
+            }
+            if container.streams.audio:
+                audio_context = container.streams.audio[0].codec_context
+                stream_info.update({
+                    "audio_codec": audio_context.name,
+                    "sample_rate": audio_context.sample_rate,
+                    "channels": audio_context.layout.nb_channels,
+                })
+    except Exception as e:
+        logger.debug(f"PyAV probe failed for {video_path}: {e}")
+        return None
+
+    if not width or not height:
+        return None
+
+    return {
+        "duration": duration,
+        "width": width,
+        "height": height,
+        "is_4k": width >= 3840 and height >= 2160,
+        **stream_info
+    }
+
+
+def _avcc_level(extradata: Optional[bytes]) -> Optional[int]:
+    """H.264 level_idc (41 = 4.1) from MP4 avcC extradata, None for other formats"""
+    if extradata and len(extradata) >= 4 and extradata[0] == 1:
+        return extradata[3]
+    return None
+
+
+def _parse_frame_rate(rate: Optional[str]) -> Optional[float]:
+    """ffprobe rate string ("30000/1001") -> fps, None if unknown ("0/0")"""
+    try:
+        num, _, den = rate.partition('/')
+        fps = float(num) / float(den or 1)
+    except (AttributeError, ValueError, ZeroDivisionError):
+        return None
+    return fps or None
+
+
 def get_video_info(video_path: str) -> Optional[Dict]:
     """
     Get video duration and resolution in a single ffprobe call.
 
+    Results are cached on disk (settings.probe_cache_path) keyed by path, size
+    and mtime, so files probed by an earlier job return without touching ffprobe.
+    Per-job copies under settings.temp_dir are always probed (never cached).
+
+    With PyAV installed the file is probed in-process first (no process spawn);
+    ffprobe is only run when PyAV can't read the file.
+
     Args:
         video_path: Path to video file
 
@@ -21,7 +208,18 @@ def get_video_info(video_path: str) -> Optional[Dict]:
             "duration": 120.5,        # seconds (float)
             "width": 1920,            # pixels (int)
             "height": 1080,           # pixels (int)
-            "is_4k": False            # bool
+            "is_4k": False,           # bool
+            "video_codec": "h264",    # stream details, used to decide whether
+            "video_profile": "High",  # the file can be stream-copied
+            "video_level": 41,        # (None when unknown)
+            "video_bit_rate": 8000000,
+            "pix_fmt": "yuv420p",
+            "sar": "1:1",
+            "time_base": "1/15360",
+            "fps": 30.0,
+            "audio_codec": "aac",     # audio keys absent if there's no audio stream
+            "sample_rate": 48000,
+            "channels": 2
         }
 
     Example:
@@ -31,12 +229,45 @@ def get_video_info(video_path: str) -> Optional[Dict]:
             print(f"Resolution: {info['width']}x{info['height']}")
             print(f"Is 4K: {info['is_4k']}")
     """
+    # One stat answers existence and supplies the cache key (no separate exists() round-trip)
+    try:
+        st = os.stat(video_path)
+    except FileNotFoundError:
+        logger.error(f"Video not found: {video_path}")
+        return None
+    except OSError as e:
+        logger.warning(f"stat failed for {video_path} ({e}), probing anyway")
+        return _probe_video_info(video_path)
+
+    return _get_video_info_for_stat(video_path, st.st_size, st.st_mtime_ns)
+
+
+def _get_video_info_for_stat(video_path: str, size: int, mtime_ns: int) -> Optional[Dict]:
+    """get_video_info for an already-stat'ed file: cache lookup, else probe and cache"""
+    info = _probe_cache_get(video_path, size, mtime_ns)
+    if info:
+        logger.debug(f"ffprobe cache hit: {video_path}")
+        return info
+
+    info = _probe_video_info(video_path)
+    if info:
+        _probe_cache_put(video_path, size, mtime_ns, info)
+    return info
+
+
+def _probe_video_info(video_path: str) -> Optional[Dict]:
+    """Probe a video with PyAV (if installed), else ffprobe (see get_video_info)"""
+    if av is not None:
+        info = _get_video_info_pyav(video_path)
+        if info:
+            return info
+
     try:
         cmd = [
             'ffprobe',
             '-v', 'error',
-            '-select_streams', 'v:0',  # First video stream
-            '-show_entries', 'stream=width,height:format=duration',
+            '-show_entries', 'stream=codec_type,codec_name,profile,level,bit_rate,width,height,pix_fmt,'
+                              'sample_aspect_ratio,time_base,avg_frame_rate,sample_rate,channels:format=duration',
             '-of', 'json',
             video_path
         ]
@@ -66,13 +297,35 @@ def get_video_info(video_path: str) -> Optional[Dict]:
         if 'format' in data and 'duration' in data['format']:
             duration = float(data['format']['duration'])
 
-        # Extract resolution from stream
+        # Extract resolution from the first video stream (and details of the first audio stream)
         width = 0
         height = 0
-        if 'streams' in data and len(data['streams']) > 0:
-            stream = data['streams'][0]
-            width = stream.get('width', 0)
-            height = stream.get('height', 0)
+        stream_info = {}
+        streams = data.get('streams', [])
+        video_stream = next((st for st in streams if st.get('codec_type') == 'video'), None)
+        audio_stream = next((st for st in streams if st.get('codec_type') == 'audio'), None)
+        if video_stream:
+            width = video_stream.get('width', 0)
+            height = video_stream.get('height', 0)
+            level = video_stream.get('level')
+            bit_rate = video_stream.get('bit_rate')
+            sar = video_stream.get('sample_aspect_ratio')
+            stream_info.update({
+                "video_codec": video_stream.get('codec_name'),
+                "video_profile": video_stream.get('profile'),
+                "video_level": level if level and level > 0 else None,  # -99 = unknown
+                "video_bit_rate": int(bit_rate) if str(bit_rate).isdigit() else None,
+                "pix_fmt": video_stream.get('pix_fmt'),
+                "sar": sar if sar and not sar.startswith('0:') else None,
+                "time_base": video_stream.get('time_base'),
+                "fps": _parse_frame_rate(video_stream.get('avg_frame_rate')),
+            })
+        if audio_stream:
+            stream_info.update({
+                "audio_codec": audio_stream.get('codec_name'),
+                "sample_rate": int(audio_stream.get('sample_rate') or 0),
+                "channels": audio_stream.get('channels'),
+            })
 
         # Check if valid video info
         if duration is None or width == 0 or height == 0:
@@ -83,7 +336,8 @@ def get_video_info(video_path: str) -> Optional[Dict]:
             "duration": duration,
             "width": width,
             "height": height,
-            "is_4k": width >= 3840 and height >= 2160
+            "is_4k": width >= 3840 and height >= 2160,
+            **stream_info
         }
 
     except subprocess.TimeoutExpired:
@@ -105,7 +359,8 @@ def get_videos_info_batch(video_paths: List[str], max_workers: int = 8) -> Dict[
 
     Args:
         video_paths: List of video file paths
-        max_workers: Maximum parallel ffprobe processes (default: 8, optimal for SMB shares)
+        max_workers: Maximum parallel ffprobe processes (default: 8, optimal for SMB shares;
+                     capped at len(video_paths) and MAX_FFPROBE_WORKERS)
 
     Returns:
         Dict mapping video_path to video info (or None if error)
@@ -123,20 +378,48 @@ def get_videos_info_batch(video_paths: List[str], max_workers: int = 8) -> Dict[
     Performance:
         - Sequential: 98 videos × 1s = 98 seconds
         - Parallel (8 workers): 98 videos ÷ 8 = ~12 seconds (31s total with overhead)
+        - With io_uring (Linux, liburing installed) all files are stat'ed in one STATX
+          batch first and cache hits return without a thread; this only helps when
+          the SMB stat is the bottleneck, cache misses still pay for a full probe
     """
     results = {}
 
     if not video_paths:
         return results
 
+    # No more workers than videos, and never more than the share can serve
+    max_workers = max(1, min(max_workers, len(video_paths), MAX_FFPROBE_WORKERS))
     logger.info(f"Getting video info for {len(video_paths)} videos (max_workers={max_workers})...")
 
+    # One io_uring STATX batch instead of a blocking stat per worker thread
+    stats = {}
+    if uring_copy.is_available():
+        try:
+            # Only paths that can hit the cache (not per-job temp copies) are worth the batch
+            cacheable = [path for path in video_paths if _probe_cacheable(path)]
+            stats = dict(zip(cacheable, uring_copy.statx_paths(cacheable)))
+        except Exception as e:
+            logger.warning(f"io_uring stat batch failed ({e}), stat'ing per file")
+
+    pending = []
+    for path in video_paths:
+        stat_key = stats.get(path)
+        info = _probe_cache_get(path, *stat_key) if stat_key else None
+        if info:
+            results[path] = info
+        else:
+            pending.append(path)
+
+    if len(pending) < len(video_paths):
+        logger.info(f"  {len(video_paths) - len(pending)} ffprobe cache hits from the stat batch")
+
     # Use ThreadPoolExecutor for parallel ffprobe calls
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
+        # Submit all tasks (failed batch stats fall back to get_video_info's own stat)
         future_to_path = {
-            executor.submit(get_video_info, path): path
-            for path in video_paths
+            (executor.submit(_get_video_info_for_stat, path, *stats[path]) if stats.get(path)
+             else executor.submit(get_video_info, path)): path
+            for path in pending
         }
 
         # Collect results as they complete
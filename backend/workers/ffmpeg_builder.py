@@ -1,6 +1,12 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import subprocess
+import logging
+import tempfile
+import hashlib
+import json
+import time
 import os
 
 
@@ -12,7 +18,8 @@ def is_gpu_available() -> bool:
         result = subprocess.run(
             ['ffmpeg', '-f', 'lavfi', '-i', 'nullsrc=s=256x256:d=0.1',
              '-c:v', 'h264_nvenc', '-f', 'null', '-'],
-            capture_output=True,
+            stdout=subprocess.DEVNULL,  # Only stderr is inspected
+            stderr=subprocess.PIPE,
             encoding='utf-8',
             errors='replace',  # Handle non-UTF-8 characters
             timeout=10
@@ -29,16 +36,85 @@ def is_gpu_available() -> bool:
         return False
 
 
+logger = logging.getLogger(__name__)
+
 _GPU_AVAILABLE = None
+_GPU_CHECKED_AT = 0.0
+
+# The NVENC probe result is shared across worker processes via a small file,
+# reused for a day unless the NVIDIA driver version changes. A negative result
+# may be transient (probe timeout while the GPU is busy), so it's only reused
+# for a few minutes, in the file and in the process.
+GPU_CACHE_FILE = Path(tempfile.gettempdir()) / "nvenc_available.json"
+GPU_CACHE_TTL = 24 * 3600  # seconds
+GPU_CACHE_NEGATIVE_TTL = 300  # seconds
+
+
+def _nvidia_driver_version() -> Optional[str]:
+    """First line of /proc/driver/nvidia/version, None without the NVIDIA driver"""
+    try:
+        with open('/proc/driver/nvidia/version', encoding='utf-8', errors='replace') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def _read_gpu_cache(driver_version: Optional[str]) -> Optional[bool]:
+    """Cached probe result if it's fresh and for the same driver, else None"""
+    try:
+        with open(GPU_CACHE_FILE, encoding='utf-8') as f:
+            cached = json.load(f)
+        ttl = GPU_CACHE_TTL if cached['available'] else GPU_CACHE_NEGATIVE_TTL
+        if cached.get('driver') == driver_version and time.time() - cached['checked_at'] < ttl:
+            return bool(cached['available'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_gpu_cache(driver_version: Optional[str], available: bool):
+    """Atomically store the probe result (tempfile + rename, so readers never see a partial file)"""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=GPU_CACHE_FILE.parent, prefix='.nvenc_available-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'driver': driver_version, 'available': available, 'checked_at': time.time()}, f)
+        os.replace(tmp_path, GPU_CACHE_FILE)
+    except OSError:
+        pass  # Cache is best-effort; the probe just runs again next process
+
 
 def check_gpu() -> bool:
-    """Check GPU availability (cached)"""
-    global _GPU_AVAILABLE
-    if _GPU_AVAILABLE is None:
-        _GPU_AVAILABLE = is_gpu_available()
+    """Check GPU availability (cached per process and on disk; negatives only briefly)"""
+    global _GPU_AVAILABLE, _GPU_CHECKED_AT
+    if _GPU_AVAILABLE is None or (
+        not _GPU_AVAILABLE and time.monotonic() - _GPU_CHECKED_AT >= GPU_CACHE_NEGATIVE_TTL
+    ):
+        driver_version = _nvidia_driver_version()
+        cached = _read_gpu_cache(driver_version)
+        if cached is None:
+            cached = is_gpu_available()
+            _write_gpu_cache(driver_version, cached)
+        _GPU_AVAILABLE = cached
+        _GPU_CHECKED_AT = time.monotonic()
     return _GPU_AVAILABLE
 
 
+# Scale to fit the target frame (keeping aspect ratio) and pad the rest black.
+# Formatted once per command; items only add their input/output labels.
+_SCALE_PAD_TPL = (
+    "scale={W}:{H}:force_original_aspect_ratio=decrease,"
+    "pad={W}:{H}:(ow-iw)/2:(oh-ih)/2:black,"
+    "setsar=1"
+)
+
+
+# Stream-copy limits, matching the MP4 encode settings below (-maxrate 9M,
+# -profile:v main -level 4.1 for Full HD, high / 5.1 for 4K; main fits in high)
+STREAM_COPY_MAX_VIDEO_BITRATE = 9_000_000  # bits/s
+STREAM_COPY_PROFILES_HD = ('main',)
+STREAM_COPY_PROFILES_4K = ('main', 'high')
+
+
 def build_unified_compilation_command(
     job_items: List[Dict],
     output_path: str,
@@ -75,6 +151,8 @@ def build_unified_compilation_command(
     # Target resolution
     target_width = 3840 if enable_4k else 1920
     target_height = 2160 if enable_4k else 1080
+    scale_pad = _SCALE_PAD_TPL.format(W=target_width, H=target_height)
+    logo_scale = f"scale={target_width}:{target_height}"
 
     filter_complex = []
 
@@ -102,16 +180,14 @@ def build_unified_compilation_command(
     for i, item in enumerate(job_items):
         item_type = item['item_type']
         item_input_idx = item_input_indices[i]
+        is_video = item_type == 'video'
+        logo_path = item.get('logo_path') if is_video else None
+        text = item.get('text_animation_text') if is_video else None
 
         if item_type == 'image':
             # Scale image and add padding
             duration = item.get('duration', 5)
-            filter_complex.append(
-                f"[{item_input_idx}:v]scale={target_width}:{target_height}:"
-                f"force_original_aspect_ratio=decrease,"
-                f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2:black,"
-                f"setsar=1,fps=30[v{i}_scaled]"
-            )
+            filter_complex.append(f"[{item_input_idx}:v]{scale_pad},fps=30[v{i}_scaled]")
 
             # Create silent audio for image
             filter_complex.append(
@@ -123,38 +199,28 @@ def build_unified_compilation_command(
 
         else:
             # Regular video - scale and pad
-            filter_complex.append(
-                f"[{item_input_idx}:v]scale={target_width}:{target_height}:"
-                f"force_original_aspect_ratio=decrease,"
-                f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2:black,"
-                f"setsar=1[v{i}_scaled]"
-            )
+            filter_complex.append(f"[{item_input_idx}:v]{scale_pad}[v{i}_scaled]")
 
             video_stream = f"[v{i}_scaled]"
 
         # Add logo overlay for videos (not intro, outro, transition, image)
-        if item_type == 'video' and item.get('logo_path'):
-            logo_path = item['logo_path']
+        if logo_path:
             cmd.extend(['-i', logo_path])
             logo_input_idx = input_index
             input_index += 1
 
             # Scale logo to full frame then overlay centered
-            filter_complex.append(
-                f"[{logo_input_idx}:v]scale={target_width}:{target_height}[logo{i}_scaled]"
-            )
+            filter_complex.append(f"[{logo_input_idx}:v]{logo_scale}[logo{i}_scaled]")
             filter_complex.append(
                 f"{video_stream}[logo{i}_scaled]overlay=(W-w)/2:(H-h)/2[v{i}_logo]"
             )
             video_stream = f"[v{i}_logo]"
 
         # Add text animation for videos using ASS subtitles
-        if item_type == 'video' and item.get('text_animation_text'):
-            text = item['text_animation_text']
-            video_duration = item.get('duration', 0)
-
-            # Generate ASS file path
-            ass_file = f"temp/{job_id}/text_{item['position']}.ass"
+        if text:
+            # Generate ASS file path (shared by items with the same text, see ass_subtitle_filename)
+            ass_filename = item.get('ass_filename') or f"text_{item['position']}.ass"
+            ass_file = f"temp/{job_id}/{ass_filename}"
 
             # Note: ASS file should be generated before calling this function
             # Using subtitles filter for ASS overlay
@@ -299,6 +365,107 @@ def build_unified_compilation_command(
     return cmd
 
 
+def can_stream_copy(job_items: List[Dict], enable_4k: bool = False, output_mxf: bool = False) -> bool:
+    """
+    Check whether the job can skip the filter graph and stream-copy its inputs.
+
+    True only when every item is a plain clip (no image, logo or text animation)
+    whose probed streams already meet the MP4 output contract of the encode path:
+    H.264 yuv420p at the target resolution with square pixels, profile and level
+    within the encoder settings (main@4.1 Full HD, high@5.1 4K), video bitrate
+    within the 9M maxrate, and AAC 48 kHz stereo. Frame rate, profile, level and
+    time base must also be identical across all items - the concat demuxer keeps
+    the first file's parameters for the whole output.
+
+    Missing probe details (unknown level, bitrate, SAR...) mean re-encode.
+
+    Args:
+        job_items: Processed job items, each with 'video_info' from get_video_info
+        enable_4k: Target 4K instead of Full HD
+        output_mxf: MXF output is always re-encoded (MPEG-2)
+    """
+    if output_mxf or not job_items:
+        return False
+
+    target_width = 3840 if enable_4k else 1920
+    target_height = 2160 if enable_4k else 1080
+    allowed_profiles = STREAM_COPY_PROFILES_4K if enable_4k else STREAM_COPY_PROFILES_HD
+    max_level = 51 if enable_4k else 41
+    stream_params = set()
+
+    for item in job_items:
+        info = item.get('video_info')
+        if item['item_type'] == 'image' or item.get('logo_path') or item.get('text_animation_text') or not info:
+            return False
+        if (info.get('video_codec') != 'h264' or info.get('pix_fmt') != 'yuv420p'
+                or info.get('width') != target_width or info.get('height') != target_height
+                or info.get('sar') != '1:1' or not info.get('time_base')
+                or (info.get('video_profile') or '').lower() not in allowed_profiles
+                or not info.get('video_level') or info['video_level'] > max_level
+                or not info.get('video_bit_rate') or info['video_bit_rate'] > STREAM_COPY_MAX_VIDEO_BITRATE
+                or info.get('audio_codec') != 'aac' or info.get('sample_rate') != 48000
+                or info.get('channels') != 2 or not info.get('fps')):
+            return False
+        stream_params.add((round(info['fps'], 2), info['video_profile'].lower(),
+                           info['video_level'], info['time_base']))
+
+    return len(stream_params) == 1
+
+
+def build_concat_copy_command(job_items: List[Dict], output_path: str, concat_list_path: str) -> List[str]:
+    """
+    Build an FFmpeg concat-demuxer command that joins the items without re-encoding.
+
+    Only valid for jobs accepted by can_stream_copy. Writes the concat list file.
+
+    Args:
+        job_items: Processed job items (ordered by position)
+        output_path: Output file path
+        concat_list_path: Where to write the concat demuxer file list
+
+    Returns:
+        FFmpeg command as list of strings
+    """
+    Path(concat_list_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(concat_list_path, 'w', encoding='utf-8') as f:
+        for item in job_items:
+            # Absolute paths (-safe 0); single quotes escaped for the concat file syntax
+            escaped_path = os.path.abspath(item['path']).replace("'", "'\\''")
+            f.write(f"file '{escaped_path}'\n")
+
+    return [
+        'ffmpeg',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', concat_list_path,
+        '-map', '0:v:0',
+        '-map', '0:a:0',
+        '-c', 'copy',
+        '-movflags', '+faststart',
+        '-y',
+        output_path
+    ]
+
+
+def ass_subtitle_filename(text: str, video_duration: float, cycle_duration: float = 20.0) -> str:
+    """
+    File name for a text animation ASS file, shared by all items with the same text.
+
+    The animation repeats every cycle_duration, so the file only depends on the
+    text and the number of cycles: videos whose durations fall in the same
+    cycle bucket reuse one file (generate it for ass_subtitle_duration(...)).
+    Events past a shorter video's end are simply never shown.
+    """
+    num_cycles = int(video_duration / cycle_duration) + 1
+    digest = hashlib.sha1(f"{num_cycles}:{text}".encode('utf-8')).hexdigest()[:16]
+    return f"text_{digest}.ass"
+
+
+def ass_subtitle_duration(video_duration: float, cycle_duration: float = 20.0) -> float:
+    """Duration covered by the shared ASS file: video_duration rounded up to the end of its cycle"""
+    return (int(video_duration / cycle_duration) + 1) * cycle_duration
+
+
 def generate_ass_subtitle_file(
     text: str,
     video_duration: float,
@@ -322,7 +489,7 @@ def generate_ass_subtitle_file(
         Path to the generated ASS file
     """
     # ASS subtitle header
-    ass_content = f"""[Script Info]
+    ass_header = f"""[Script Info]
 Title: Animated Text
 ScriptType: v4.00+
 WrapStyle: 0
@@ -341,40 +508,76 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
     num_cycles = int(video_duration / cycle_duration) + 1
 
     def format_time(seconds):
-        """Convert seconds to ASS time format (H:MM:SS.CS)"""
-        h = int(seconds // 3600)
-        m = int((seconds % 3600) // 60)
-        s = seconds % 60
-        return f"{h}:{m:02d}:{s:05.2f}"
-
-    # Generate animated text for each cycle
-    for cycle in range(num_cycles):
-        cycle_start = cycle * cycle_duration
-
-        # Letter-by-letter animation
-        for i in range(1, len(text) + 1):
-            substring = text[:i]
-            start_time = cycle_start + (i - 1) * letter_delay
-
-            # Last letter stays until visible_duration ends
-            if i == len(text):
-                end_time = cycle_start + visible_duration
-            else:
-                end_time = cycle_start + i * letter_delay
+        """Convert seconds to ASS time format (H:MM:SS.CS), integer math on centiseconds"""
+        m, cs = divmod(round(seconds * 100), 6000)
+        h, m = divmod(m, 60)
+        return f"{h}:{m:02d}:{cs // 100:02d}.{cs % 100:02d}"
 
-            # Stop if we exceed video duration
-            if start_time >= video_duration:
-                break
+    # Dialogue lines are written straight to the file (no growing string - this runs
+    # num_cycles x len(text) times)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(ass_header)
 
-            start_str = format_time(start_time)
-            end_str = format_time(min(end_time, video_duration))
+        # Generate animated text for each cycle
+        for cycle in range(num_cycles):
+            cycle_start = cycle * cycle_duration
 
-            # Add fade effect and force top-right alignment with \an9
-            ass_content += f"Dialogue: 0,{start_str},{end_str},Default,,0,0,0,,{{\\an9\\fad(150,0)}}{substring}\n"
+            # Letter-by-letter animation
+            for i in range(1, len(text) + 1):
+                substring = text[:i]
+                start_time = cycle_start + (i - 1) * letter_delay
 
-    # Write ASS file
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(ass_content)
+                # Last letter stays until visible_duration ends
+                if i == len(text):
+                    end_time = cycle_start + visible_duration
+                else:
+                    end_time = cycle_start + i * letter_delay
+
+                # Stop if we exceed video duration
+                if start_time >= video_duration:
+                    break
+
+                start_str = format_time(start_time)
+                end_str = format_time(min(end_time, video_duration))
+
+                # Add fade effect and force top-right alignment with \an9
+                f.write(f"Dialogue: 0,{start_str},{end_str},Default,,0,0,0,,{{\\an9\\fad(150,0)}}{substring}\n")
 
     return output_path
+
+
+# Below this many ASS files, process startup costs more than generating them inline
+ASS_PARALLEL_MIN_FILES = 4
+MAX_ASS_WORKERS = 8
+
+
+def _generate_ass_from_spec(spec: Dict) -> str:
+    """Picklable wrapper so specs can be mapped over a process pool"""
+    return generate_ass_subtitle_file(**spec)
+
+
+def generate_ass_subtitle_files(specs: List[Dict]) -> List[str]:
+    """
+    Generate several ASS files (generate_ass_subtitle_file kwargs per spec) in parallel.
+
+    Generation is CPU-bound Python, so larger batches use a process pool. Small
+    batches run inline, and a thread pool is used where child processes can't be
+    started (e.g. inside a daemonic Celery prefork worker).
+
+    Returns:
+        Paths of the generated files, in spec order
+    """
+    if len(specs) < ASS_PARALLEL_MIN_FILES:
+        return [_generate_ass_from_spec(spec) for spec in specs]
+
+    max_workers = min(len(specs), os.cpu_count() or 1, MAX_ASS_WORKERS)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_generate_ass_from_spec, specs))
+    except (AssertionError, OSError, RuntimeError) as e:
+        # AssertionError: "daemonic processes are not allowed to have children"
+        # (BrokenProcessPool is a RuntimeError)
+        logger.warning(f"Process pool unavailable for ASS generation ({e}), using threads")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_generate_ass_from_spec, specs))
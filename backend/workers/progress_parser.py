@@ -1,8 +1,81 @@
+import os
 import re
+import queue
+import select
+from collections import deque
 import subprocess
-from services.supabase import get_supabase_client
+import threading
+import time
+from typing import Iterator
+from services.supabase import patch_rows, pg_update_job_progress
+from api.config import get_settings
 
-def parse_ffmpeg_progress(line: str) -> dict:
+# Optional: psycopg2 (pip install psycopg2-binary) + settings.supabase_db_url push
+# cancellations via LISTEN/NOTIFY. Without them, cancellation is detected from the
+# progress updates (see _ProgressUpdater).
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+# Compiled once; matched against raw stderr bytes (no per-line utf-8 decode)
+_TIME_RE = re.compile(rb'time=(\d+):(\d+):(\d+\.\d+)')
+# fps and speed in one pass over the line (first occurrence of each wins)
+_FPS_SPEED_RE = re.compile(rb'fps=\s*(?P<fps>\d+)|speed=\s*(?P<speed>\d+\.?\d*)x')
+_LINE_END_RE = re.compile(rb'\r\n|[\r\n]')  # '\r\n' is one line end, not two
+
+# At most one Supabase progress write per interval (seconds)
+PROGRESS_UPDATE_INTERVAL = 2.0
+
+# NOTIFY channel fired by the jobs_notify_cancelled trigger (payload: job_id)
+CANCEL_CHANNEL = "job_cancelled"
+CANCEL_TRIGGER = "jobs_notify_cancelled"  # SQL in docs/architecture.md
+_cancel_trigger_checked = False  # The trigger's existence is checked once per process
+
+# Bytes per os.read() on the stderr pipe
+STDERR_READ_SIZE = 65536
+
+# stderr lines kept in memory for the failure log (the full stderr is streamed to disk)
+STDERR_TAIL_LINES = 200
+
+# workers.tasks.check_and_prefetch_next_job, resolved on first use (workers.tasks
+# imports this module, so it can't be imported at module scope)
+_PREFETCH_FUNC = None
+
+def _get_prefetch_func():
+    """Prefetch function, imported once per process (None if unavailable)"""
+    global _PREFETCH_FUNC
+    if _PREFETCH_FUNC is None:
+        try:
+            from workers.tasks import check_and_prefetch_next_job
+        except ImportError:
+            return None
+        _PREFETCH_FUNC = check_and_prefetch_next_job
+    return _PREFETCH_FUNC
+
+def _parse_time_ms(line: bytes):
+    """
+    Read time=HH:MM:SS.cc from a progress line by byte indexing (no regex).
+
+    Returns milliseconds, or None if the line has no time= field in exactly
+    that layout (N/A, negative, 3-digit hours) - callers fall back to _TIME_RE.
+    """
+    i = line.rfind(b'time=')
+    if i < 0 or len(line) < i + 16:
+        return None
+    i += 5
+    if line[i + 2] != 58 or line[i + 5] != 58 or line[i + 8] != 46:  # ':' ':' '.'
+        return None
+    digits = (line[i], line[i + 1], line[i + 3], line[i + 4], line[i + 6], line[i + 7], line[i + 9], line[i + 10])
+    if not all(48 <= d <= 57 for d in digits):
+        return None
+    h = (digits[0] - 48) * 10 + (digits[1] - 48)
+    m = (digits[2] - 48) * 10 + (digits[3] - 48)
+    sec = (digits[4] - 48) * 10 + (digits[5] - 48)
+    cs = (digits[6] - 48) * 10 + (digits[7] - 48)
+    return ((h * 60 + m) * 60 + sec) * 1000 + cs * 10
+
+def parse_ffmpeg_progress(line: bytes) -> dict:
     """
     Parse FFmpeg stderr output for progress information.
 
@@ -13,27 +86,215 @@ def parse_ffmpeg_progress(line: str) -> dict:
     """
     result = {}
 
-    # Parse time: time=00:01:23.45
-    time_match = re.search(r'time=(\d+):(\d+):(\d+\.\d+)', line)
-    if time_match:
-        h, m, s = time_match.groups()
-        result['current_time'] = int(h)*3600 + int(m)*60 + float(s)
+    # Banner/codec lines carry no progress: one memchr-backed substring test
+    # instead of a regex scan (fps/speed are only read from lines with a time)
+    if b'time=' not in line:
+        return result
 
-    # Parse fps: fps=30
-    fps_match = re.search(r'fps=\s*(\d+)', line)
-    if fps_match:
-        result['fps'] = int(fps_match.group(1))
+    # Parse time: time=00:01:23.45 (byte-indexed fast path, regex for unusual layouts)
+    time_ms = _parse_time_ms(line)
+    if time_ms is not None:
+        result['current_time'] = time_ms / 1000
+    else:
+        time_match = _TIME_RE.search(line)
+        if time_match:
+            h, m, s = time_match.groups()
+            result['current_time'] = int(h)*3600 + int(m)*60 + float(s)
+
+    # time=N/A - not a usable progress line
+    if not result:
+        return result
 
-    # Parse speed: speed=1.5x
-    speed_match = re.search(r'speed=\s*(\d+\.?\d*)x', line)
-    if speed_match:
-        result['speed'] = float(speed_match.group(1))
+    # Parse fps and speed: fps=30 ... speed=1.5x
+    for match in _FPS_SPEED_RE.finditer(line):
+        fps, speed = match.group('fps', 'speed')
+        if fps is not None:
+            result.setdefault('fps', int(fps))
+        else:
+            result.setdefault('speed', float(speed))
+        if len(result) == 3:
+            break
 
     return result
 
+def _iter_stderr_lines(fd: int) -> Iterator[bytes]:
+    """
+    Yield stderr lines as bytes, terminator included.
+
+    Reads the raw pipe fd directly (one syscall per STDERR_READ_SIZE, no
+    BufferedReader/TextIOWrapper layers). FFmpeg ends its progress lines with
+    '\\r' (not '\\n'), so both are treated as line ends; '\\r\\n' counts once,
+    so no empty lines end up in the log tail.
+    """
+    pending = b''
+    while True:
+        chunk = os.read(fd, STDERR_READ_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+        start = 0
+        for match in _LINE_END_RE.finditer(pending):
+            if match.end() == len(pending) and pending.endswith(b'\r'):
+                break  # May be the first half of a '\r\n' split across reads
+            yield pending[start:match.end()]
+            start = match.end()
+        pending = pending[start:]
+    if pending:
+        yield pending
+
+class _ProgressUpdater:
+    """
+    Writes job progress to Supabase from a daemon thread.
+
+    The stderr loop only hands over the latest value, so a slow Supabase
+    round-trip never stops it from draining FFmpeg's pipe. Pending values
+    are coalesced: only the newest one is written - straight to Postgres when
+    a direct connection is configured (pg_update_job_progress), otherwise as a
+    PATCH on the pooled HTTP/2 connection (patch_rows).
+
+    Both skip cancelled jobs and report whether a row was updated, so the same
+    round-trip doubles as the cancellation check: nothing updated means the job
+    was cancelled (or deleted) and `cancelled` is set.
+    """
+
+    def __init__(self, job_id: str, logger):
+        self._job_id = job_id
+        self._logger = logger
+        self.cancelled = threading.Event()
+        self._pending = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name=f"progress-{job_id}", daemon=True)
+        self._thread.start()
+
+    def submit(self, progress: int):
+        """Queue a progress value, replacing one that hasn't been written yet"""
+        while True:
+            try:
+                self._pending.put_nowait(progress)
+                return
+            except queue.Full:
+                try:
+                    self._pending.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def close(self, final_progress: int = None):
+        """Write final_progress (if given), then stop the thread once the queue is drained"""
+        if final_progress is not None:
+            self.submit(final_progress)
+        self._pending.put(None)
+        self._thread.join(timeout=30)
+
+    def _run(self):
+        while True:
+            progress = self._pending.get()
+            if progress is None:
+                return
+            try:
+                updated = self._write(progress)
+                if not updated:
+                    self.cancelled.set()
+            except Exception as e:
+                self._logger.error(f"Failed to update progress: {e}")
+
+    def _write(self, progress: int) -> bool:
+        """Write one progress value, True if the (non-cancelled) job row was updated"""
+        try:
+            updated = pg_update_job_progress(self._job_id, progress)
+        except Exception as e:
+            self._logger.warning(f"Direct Postgres progress update failed ({e}), using REST")
+            updated = None
+        if updated is not None:
+            return updated
+
+        return bool(patch_rows(
+            'jobs',
+            {'job_id': self._job_id},
+            {'progress': progress, 'status': 'processing'},
+            exclude={'status': 'cancelled'},  # Never overwrite a cancellation
+            returning='status'
+        ))
+
+class _CancelListener:
+    """
+    Sets `cancelled` as soon as Postgres NOTIFYs CANCEL_CHANNEL with this job's id.
+
+    Runs LISTEN on its own connection in a daemon thread; start() returns False
+    (and nothing runs) when psycopg2 or settings.supabase_db_url is missing.
+    """
+
+    def __init__(self, job_id: str, cancelled: threading.Event, logger):
+        self._job_id = job_id
+        self._logger = logger
+        self.cancelled = cancelled
+        self.notified = False  # True once this listener (not the updater) saw the cancellation
+        self.listening = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> bool:
+        db_url = get_settings().supabase_db_url
+        if psycopg2 is None or not db_url:
+            return False
+        self._thread = threading.Thread(
+            target=self._run, args=(db_url,), name=f"cancel-listener-{self._job_id}", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self, db_url: str):
+        try:
+            conn = psycopg2.connect(db_url)
+        except Exception as e:
+            self._logger.warning(f"Cancel listener unavailable ({e}), relying on progress updates")
+            return
+        try:
+            conn.autocommit = True  # NOTIFYs are only delivered outside a transaction
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CANCEL_CHANNEL}")
+                self._check_trigger(cur)
+            self.listening = True
+            while not self._stop.is_set():
+                # Wake up at least once a second to notice stop()
+                if select.select([conn], [], [], 1.0)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        if conn.notifies.pop(0).payload == self._job_id:
+                            self.notified = True
+                            self.cancelled.set()
+                            return
+        except Exception as e:
+            self._logger.warning(f"Cancel listener stopped ({e}), relying on progress updates")
+        finally:
+            conn.close()
+
+    def _check_trigger(self, cur):
+        """Warn (once per process) if the trigger that sends the NOTIFYs isn't installed"""
+        global _cancel_trigger_checked
+        if _cancel_trigger_checked:
+            return
+        _cancel_trigger_checked = True
+        try:
+            cur.execute("SELECT 1 FROM pg_trigger WHERE tgname = %s", (CANCEL_TRIGGER,))
+            found = cur.fetchone() is not None
+        except Exception as e:
+            self._logger.debug(f"Could not check for trigger {CANCEL_TRIGGER}: {e}")
+            return
+        if not found:
+            self._logger.warning(
+                f"Trigger {CANCEL_TRIGGER} not found (see docs/architecture.md): no cancellation "
+                f"NOTIFYs will arrive, cancellations are only detected from progress updates"
+            )
+
 def run_ffmpeg_with_progress(cmd: list, job_id: str, total_duration: float, logger, log_dir: str, worker_name: str = None):
     """
     Run FFmpeg command and parse progress, updating Supabase in real-time.
+    Cancellation is pushed via Postgres NOTIFY when configured (_CancelListener),
+    otherwise detected from the progress updates themselves (_ProgressUpdater).
     Periodically checks for new jobs in queue and starts prefetching.
 
     Args:
@@ -45,7 +306,6 @@ def run_ffmpeg_with_progress(cmd: list, job_id: str, total_duration: float, logg
         worker_name: Celery worker hostname (for prefetch checks)
     """
     from pathlib import Path
-    supabase = get_supabase_client()
 
     # Write full FFmpeg command to file (in same directory as logs)
     cmd_file = Path(log_dir) / f"ffmpeg_cmd.txt"
@@ -56,76 +316,100 @@ def run_ffmpeg_with_progress(cmd: list, job_id: str, total_duration: float, logg
     logger.info(f"Starting FFmpeg process")
     logger.info(f"Expected output duration: {total_duration:.2f}s")
 
+    # Binary stderr: progress is parsed from bytes, text is only decoded for the log tail
     process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        encoding='utf-8',
-        errors='replace',  # Handle non-UTF-8 characters in video metadata
-        bufsize=1
+        bufsize=0  # stderr is read straight from its fd
     )
 
+    # Full stderr goes straight to file (in same directory as logs) as it's read
+    stderr_file = Path(log_dir) / f"ffmpeg_stderr.txt"
+    stderr_out = open(stderr_file, 'wb', buffering=STDERR_READ_SIZE)  # One write() per read chunk
+
     last_progress = 0
+    last_sent_progress = 0  # Last value handed to the progress updater
+    last_update_ts = time.monotonic()
+    progress_updater = _ProgressUpdater(job_id, logger)
+    # Push-based cancellation when available; sets the same event as the updater
+    cancel_listener = _CancelListener(job_id, progress_updater.cancelled, logger)
+    if cancel_listener.start():
+        logger.info("Listening for cancellation via Postgres NOTIFY")
     last_prefetch_check = 0  # Track when we last checked for prefetch
-    last_cancel_check = 0  # Track when we last checked for cancellation
-    stderr_lines = []  # Collect all stderr for full error reporting
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)  # Recent lines for error reporting
     cancelled = False  # Flag to track if job was cancelled
+    final_progress = None  # Last throttled value, flushed when the updater closes
 
-    # Import prefetch function
+    # Prefetch function (cached after the first job)
     prefetch_func = None
     if worker_name:
-        try:
-            from workers.tasks import check_and_prefetch_next_job
-            prefetch_func = check_and_prefetch_next_job
-        except ImportError:
+        prefetch_func = _get_prefetch_func()
+        if prefetch_func is None:
             logger.warning("Could not import prefetch function")
 
-    for line in process.stderr:
-        stderr_lines.append(line)  # Store all stderr lines
+    try:
+        for line in _iter_stderr_lines(process.stderr.fileno()):
+            stderr_out.write(line)
+            stderr_tail.append(line)
 
-        # Parse progress
-        parsed = parse_ffmpeg_progress(line)
+            # Set by the cancel listener (NOTIFY) or the progress updater (PATCH found the job cancelled)
+            if progress_updater.cancelled.is_set():
+                logger.warning(f"Job cancelled by user at {last_progress}% - terminating FFmpeg")
+                if cancel_listener.listening and not cancel_listener.notified:
+                    logger.warning(f"Cancellation came from a progress update, not a NOTIFY - "
+                                   f"check the {CANCEL_TRIGGER} trigger")
+                cancelled = True
+                process.terminate()
+                process.wait(timeout=5)  # Wait up to 5 seconds for graceful termination
+                break
 
-        if 'current_time' in parsed:
-            current_time = parsed['current_time']
-            progress = int((current_time / total_duration) * 100)
-            progress = min(progress, 99)  # Never show 100% until done
+            # Non-progress lines (banner, stream info, warnings) skip the parser call entirely
+            if b'time=' not in line or total_duration <= 0:
+                continue
 
-            # Only update if progress changed by at least 1%
-            if progress > last_progress:
-                try:
-                    supabase.table('jobs').update({
-                        'progress': progress,
-                        'status': 'processing'
-                    }).eq('job_id', job_id).execute()
+            # Parse progress
+            parsed = parse_ffmpeg_progress(line)
+
+            if 'current_time' in parsed:
+                current_time = parsed['current_time']
+                progress = int((current_time / total_duration) * 100)
+                progress = min(progress, 99)  # Never show 100% until done
 
-                    logger.info(f"Progress: {progress}% (time: {current_time:.2f}s)")
+                # Only update if progress changed by at least 1%
+                if progress > last_progress:
                     last_progress = progress
-                except Exception as e:
-                    logger.error(f"Failed to update progress: {e}")
-
-                # Check for cancellation every 5% progress
-                if progress >= last_cancel_check + 5:
-                    try:
-                        job_status = supabase.table('jobs').select('status').eq('job_id', job_id).single().execute()
-                        if job_status.data and job_status.data.get('status') == 'cancelled':
-                            logger.warning(f"Job cancelled by user at {progress}% - terminating FFmpeg")
-                            process.terminate()
-                            process.wait(timeout=5)  # Wait up to 5 seconds for graceful termination
-                            cancelled = True
-                            break
-                        last_cancel_check = progress
-                    except Exception as e:
-                        logger.warning(f"  Cancel check failed: {e}")
-
-                # Check for new jobs to prefetch every 20% progress (separate from DB update)
-                if prefetch_func and progress >= last_prefetch_check + 20:
-                    try:
-                        logger.info(f"  [Prefetch check at {progress}%]")
-                        prefetch_func(worker_name, logger, current_job_id=job_id)
-                        last_prefetch_check = progress
-                    except Exception as e:
-                        logger.warning(f"  Prefetch check failed: {e}")
+
+                    # Written from the updater thread, at most once per PROGRESS_UPDATE_INTERVAL
+                    now = time.monotonic()
+                    if now - last_update_ts >= PROGRESS_UPDATE_INTERVAL:
+                        progress_updater.submit(progress)
+                        last_sent_progress = progress
+                        last_update_ts = now
+                        logger.info(f"Progress: {progress}% (time: {current_time:.2f}s)")
+
+                    # Check for new jobs to prefetch every 20% progress (separate from DB update)
+                    if prefetch_func and progress >= last_prefetch_check + 20:
+                        try:
+                            logger.info(f"  [Prefetch check at {progress}%]")
+                            prefetch_func(worker_name, logger, current_job_id=job_id)
+                            last_prefetch_check = progress
+                        except Exception as e:
+                            logger.warning(f"  Prefetch check failed: {e}")
+
+        # Flush the last throttled value (not on cancel - the job is already finished with)
+        if not cancelled and last_progress != last_sent_progress:
+            final_progress = last_progress
+    except BaseException:
+        # Don't leave FFmpeg running when reading its output fails
+        if process.poll() is None:
+            process.kill()
+        raise
+    finally:
+        # Always stop both threads (the listener holds a Postgres connection) and close the stderr file
+        progress_updater.close(final_progress)
+        cancel_listener.stop()
+        stderr_out.close()
 
     # If cancelled, clean up and raise exception
     if cancelled:
@@ -137,17 +421,13 @@ def run_ffmpeg_with_progress(cmd: list, job_id: str, total_duration: float, logg
     # Wait for process to complete
     returncode = process.wait()
 
-    # Write full stderr to file (in same directory as logs)
-    stderr_file = Path(log_dir) / f"ffmpeg_stderr.txt"
-    with open(stderr_file, 'w', encoding='utf-8') as f:
-        f.writelines(stderr_lines)
-
     if returncode == 0:
         logger.info("FFmpeg completed successfully")
         logger.info(f"Full stderr written to: {stderr_file}")
     else:
         logger.error(f"FFmpeg failed with code {returncode}")
         logger.error(f"Full stderr written to: {stderr_file}")
-        logger.error(f"Error output (last 50 lines):\n{''.join(stderr_lines[-50:])}")
+        error_tail = b''.join(list(stderr_tail)[-50:]).decode('utf-8', errors='replace')  # Non-UTF-8 metadata
+        logger.error(f"Error output (last 50 lines):\n{error_tail}")
 
     return returncode
@@ -7,13 +7,19 @@ from services.storage import (
     cleanup_temp_dir, normalize_path_for_server
 )
 from services.logger import setup_job_logger, cleanup_old_logs
-from workers.ffmpeg_builder import build_unified_compilation_command, generate_ass_subtitle_file
+from workers.ffmpeg_builder import (
+    build_unified_compilation_command, build_concat_copy_command, can_stream_copy,
+    generate_ass_subtitle_files, ass_subtitle_filename, ass_subtitle_duration
+)
 from workers.progress_parser import run_ffmpeg_with_progress
-from utils.video_utils import get_videos_info_batch
+from utils.video_utils import get_video_info, get_videos_info_batch
 from api.config import get_settings
 from datetime import datetime, timedelta
 from pathlib import Path
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 import time
 import logging
 
@@ -21,6 +27,73 @@ import logging
 _prefetched_jobs = set()
 
 
+@dataclass(slots=True)
+class ItemMeta:
+    """Per-item bookkeeping between the copy (Step 1b/1c) and item processing (Step 1e)"""
+    item: dict
+    item_type: str
+    position: int
+    item_filename: str
+    logo_filename: Optional[str] = None
+
+
+def _build_copy_list(items: list, videos_info: dict, strict: bool = True):
+    """
+    Build the temp-dir copy list for a job's items (items + logos).
+
+    Shared by the job itself (Step 1b) and the next-job prefetch, so both
+    produce the same dest filenames and the prefetched files are recognised.
+
+    Args:
+        items: job_items rows
+        videos_info: video_id -> {'path': ...} from get_videos_info_by_ids
+        strict: Raise on items without a resolvable path (the job); with
+                strict=False they're skipped (prefetch is best-effort)
+
+    Returns:
+        (files_to_copy, item_metadata): copy_files_parallel input, and one
+        ItemMeta per copied item
+    """
+    files_to_copy = []
+    item_metadata = []
+
+    for item in items:
+        item_type = item['item_type']
+        position = item['position']
+
+        # Get source path (from batch query or direct path)
+        video_id = item.get('video_id')
+        if video_id and video_id in videos_info:
+            source_path = videos_info[video_id]['path']
+        elif video_id and strict:
+            raise Exception(f"Video ID {video_id} not found in BigQuery")
+        else:
+            source_path = item.get('path')
+
+        if not source_path:
+            if strict:
+                raise Exception(f"No path for {item_type} at position {position}")
+            continue
+
+        # Add item file to copy list
+        normalized_path = normalize_path_for_server(source_path)
+        item_filename = f"{item_type}_{position}{Path(normalized_path).suffix}"
+        files_to_copy.append({'source_path': normalized_path, 'dest_filename': item_filename})
+
+        logo_filename = None
+        if item_type == 'video' and item.get('logo_path'):
+            logo_filename = f"logo_{position}.png"
+            files_to_copy.append({
+                'source_path': normalize_path_for_server(item['logo_path']),
+                'dest_filename': logo_filename
+            })
+
+        # Track metadata for later processing
+        item_metadata.append(ItemMeta(item, item_type, position, item_filename, logo_filename))
+
+    return files_to_copy, item_metadata
+
+
 def check_and_prefetch_next_job(worker_name: str, logger, current_job_id: str = None):
     """
     Check for next job in queue and start prefetching files in background.
@@ -36,7 +109,9 @@ def check_and_prefetch_next_job(worker_name: str, logger, current_job_id: str =
     global _prefetched_jobs
 
     try:
-        inspect = current_app.control.inspect()
+        # Ask only this worker: Celery then stops waiting at its reply (limit=1)
+        # instead of broadcasting to the fleet and sitting out the full timeout
+        inspect = current_app.control.inspect(destination=[worker_name], timeout=1.0)
         reserved = inspect.reserved()
 
         if not reserved or worker_name not in reserved:
@@ -83,32 +158,16 @@ def check_and_prefetch_next_job(worker_name: str, logger, current_job_id: str =
                     if next_video_ids:
                         next_videos_info = get_videos_info_by_ids(next_video_ids)
 
-                    # Build file list
-                    next_files = []
-                    for item in next_items:
-                        if item.get('video_id') and item['video_id'] in next_videos_info:
-                            source_path = next_videos_info[item['video_id']]['path']
-                        else:
-                            source_path = item.get('path')
-
-                        if source_path:
-                            normalized = normalize_path_for_server(source_path)
-                            file_ext = Path(normalized).suffix
-                            filename = f"{item['item_type']}_{item['position']}{file_ext}"
-                            next_files.append({'source_path': normalized, 'dest_filename': filename})
-
-                        # Add logo if exists
-                        if item['item_type'] == 'video' and item.get('logo_path'):
-                            logo_normalized = normalize_path_for_server(item['logo_path'])
-                            logo_filename = f"logo_{item['position']}.png"
-                            next_files.append({'source_path': logo_normalized, 'dest_filename': logo_filename})
+                    # Build file list (same filenames the job itself will look for)
+                    next_files, _ = _build_copy_list(next_items, next_videos_info, strict=False)
 
                     # Copy files in parallel
                     if next_files:
                         settings = get_settings()
                         dest_dir = str(Path(settings.temp_dir) / job_id)
                         logger.info(f"  Prefetching {len(next_files)} files for job {job_id}")
-                        copy_files_parallel(next_files, dest_dir, max_workers=5)
+                        # Fresh temp dir for a job that hasn't started - no prefetch to detect
+                        copy_files_parallel(next_files, dest_dir, skip_existence_check=True)
                         logger.info(f"  Prefetch completed for job {job_id}")
 
                 except Exception as e:
@@ -205,13 +264,37 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
     supabase = get_supabase_client()
     start_time = time.time()
 
-    # Get job from database
-    job_result = supabase.table("jobs").select("*").eq("job_id", job_id).execute()
-
-    if not job_result.data:
-        return {"status": "failed", "error": "Job not found"}
-
-    job = job_result.data[0]
+    # Get job, its owner's username and its items in one query (embedded via the
+    # jobs.user_id -> profiles and job_items.job_id -> jobs foreign keys)
+    items = None
+    try:
+        job_result = supabase.table("jobs").select(
+            "*, profiles!user_id(username), job_items(*)"
+        ).eq("job_id", job_id).execute()
+    except Exception as e:
+        # Embedding failed (relationship missing/renamed, RLS on profiles...): separate queries
+        logging.warning(f"Embedded job fetch failed for {job_id} ({e}), querying job, items and profile separately")
+        job_result = None
+
+    if job_result is None:
+        job_result = supabase.table("jobs").select("*").eq("job_id", job_id).execute()
+        if not job_result.data:
+            return {"status": "failed", "error": "Job not found"}
+        job = job_result.data[0]
+        profile = {}
+        try:
+            profile_result = supabase.table("profiles").select("username").eq("id", job.get('user_id')).execute()
+            if profile_result.data:
+                profile = profile_result.data[0]
+        except Exception:
+            pass  # Use default if lookup fails
+    else:
+        if not job_result.data:
+            return {"status": "failed", "error": "Job not found"}
+        job = job_result.data[0]
+        profile = job.pop('profiles', None) or {}  # No profile row: username stays unknown
+        # Unified sequence: intro, videos, transitions, outro, images (ordered by position)
+        items = sorted(job.pop('job_items', None) or [], key=lambda item: item['position'])
 
     # Idempotency check: Skip if job already completed or cancelled (prevents duplicate processing from task redelivery)
     if job.get('status') in ['completed', 'cancelled']:
@@ -219,15 +302,7 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
         return {"status": "skipped", "reason": f"already_{job.get('status')}", "job_id": job_id}
 
     user_id = job.get('user_id', 'unknown')
-
-    # Get username from profiles table
-    username = "unknown"
-    try:
-        profile_result = supabase.table("profiles").select("username").eq("id", user_id).execute()
-        if profile_result.data:
-            username = profile_result.data[0].get('username', 'unknown')
-    except Exception:
-        pass  # Use default if lookup fails
+    username = profile.get('username') or 'unknown'
 
     # Setup job logger with username for readable log paths
     logger, log_path = setup_job_logger(job_id, username, job['channel_name'])
@@ -254,9 +329,9 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
             'queue_name': task.request.delivery_info.get('routing_key', 'unknown')
         }).eq('job_id', job_id).execute()
 
-        # Get job items (unified sequence: intro, videos, transitions, outro, images)
-        items_result = supabase.table("job_items").select("*").eq("job_id", job_id).order("position").execute()
-        items = items_result.data
+        # Not embedded above (fallback path): fetch the items on their own
+        if items is None:
+            items = supabase.table("job_items").select("*").eq("job_id", job_id).order("position").execute().data
 
         if not items:
             raise Exception("No items found for job")
@@ -276,53 +351,8 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
         # Step 1b: Prepare file list and copy in parallel
         logger.info("Step 1b: Preparing file list for parallel copy")
 
-        # Build list of all files to copy (items + logos)
-        files_to_copy = []
-        item_metadata = []  # Track metadata for each item
-
-        for i, item in enumerate(items):
-            item_type = item['item_type']
-            position = item['position']
-
-            # Get source path (from batch query or direct path)
-            if item.get('video_id'):
-                video_id = item['video_id']
-                if video_id not in videos_info:
-                    raise Exception(f"Video ID {video_id} not found in BigQuery")
-                source_path = videos_info[video_id]['path']
-            else:
-                source_path = item.get('path')
-
-            if not source_path:
-                raise Exception(f"No path for {item_type} at position {position}")
-
-            # Add item file to copy list
-            normalized_path = normalize_path_for_server(source_path)
-            file_ext = Path(normalized_path).suffix
-            item_filename = f"{item_type}_{position}{file_ext}"
-
-            files_to_copy.append({
-                'source_path': normalized_path,
-                'dest_filename': item_filename
-            })
-
-            # Track metadata for later processing
-            logo_filename = None
-            if item_type == 'video' and item.get('logo_path'):
-                logo_source = normalize_path_for_server(item['logo_path'])
-                logo_filename = f"logo_{position}.png"
-                files_to_copy.append({
-                    'source_path': logo_source,
-                    'dest_filename': logo_filename
-                })
-
-            item_metadata.append({
-                'item': item,
-                'item_type': item_type,
-                'position': position,
-                'item_filename': item_filename,
-                'logo_filename': logo_filename
-            })
+        # Build list of all files to copy (items + logos) and per-item metadata
+        files_to_copy, item_metadata = _build_copy_list(items, videos_info)
 
         # Step 1c: Copy all files in parallel (5x faster than sequential)
         logger.info(f"Step 1c: Copying {len(files_to_copy)} files in parallel (items + logos)")
@@ -333,13 +363,24 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
         settings = get_settings()
         dest_dir = str(Path(settings.temp_dir) / job_id)
 
-        copy_results = copy_files_parallel(
-            source_files=files_to_copy,
-            dest_dir=dest_dir,
-            max_workers=5,  # Optimal for most cases
-            job_logger=logger,
-            job_id=job_id
-        )
+        # Step 1d runs alongside the copy: each video is probed as soon as it lands,
+        # so probing overlaps the remaining (SMB-bound) copies
+        probe_filenames = {meta.item_filename for meta in item_metadata if meta.item_type != 'image'}
+        probe_futures = {}  # local path -> Future[video info]
+
+        with ThreadPoolExecutor(max_workers=8) as probe_pool:
+            def probe_when_copied(dest_filename, local_path):
+                if dest_filename in probe_filenames:
+                    probe_futures[local_path] = probe_pool.submit(get_video_info, local_path)
+
+            copy_results = copy_files_parallel(
+                source_files=files_to_copy,
+                dest_dir=dest_dir,
+                job_logger=logger,
+                job_id=job_id,
+                on_file_copied=probe_when_copied
+            )
+            videos_durations_info = {path: future.result() for path, future in probe_futures.items()}
 
         # Check if all copies succeeded
         failed_copies = [k for k, v in copy_results.items() if v is None]
@@ -348,39 +389,43 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
 
         logger.info(f"✓ All {len(files_to_copy)} files copied successfully")
 
-        # Step 1d: Batch query all video durations in parallel
-        logger.info("Step 1d: Batch querying video durations (parallel ffprobe)")
+        # Step 1d: Video durations (probed during the copy, see above)
+        logger.info("Step 1d: Collecting video durations (probed during copy)")
 
         # Collect all video/intro/outro/transition paths (not images)
         video_paths = [
-            copy_results[meta['item_filename']]
+            copy_results[meta.item_filename]
             for meta in item_metadata
-            if meta['item_type'] != 'image'
+            if meta.item_type != 'image'
         ]
 
-        # Batch query durations in parallel (uses ThreadPoolExecutor internally)
-        videos_durations_info = {}
+        # Anything the copy didn't report (shouldn't happen) is probed in one batch now
+        unprobed_paths = [path for path in video_paths if path not in videos_durations_info]
+        if unprobed_paths:
+            videos_durations_info.update(get_videos_info_batch(unprobed_paths, max_workers=8))
+
         if video_paths:
-            videos_durations_info = get_videos_info_batch(video_paths, max_workers=8)
-            success_count = sum(1 for info in videos_durations_info.values() if info is not None)
+            success_count = sum(1 for path in video_paths if videos_durations_info.get(path) is not None)
             logger.info(f"  Retrieved durations for {success_count}/{len(video_paths)} videos")
 
         # Step 1e: Process items (apply durations, generate ASS files)
         logger.info("Step 1e: Processing items (applying durations, text animation)")
         processed_items = []
+        ass_specs = {}  # ASS filename -> generation kwargs (items with the same text and cycle count share one file)
 
         for meta in item_metadata:
-            item = meta['item']
-            item_type = meta['item_type']
-            position = meta['position']
-            item_filename = meta['item_filename']
-            logo_filename = meta['logo_filename']
+            item = meta.item
+            item_type = meta.item_type
+            position = meta.position
+            item_filename = meta.item_filename
+            logo_filename = meta.logo_filename
 
             # Get local paths from copy results
             local_path = copy_results[item_filename]
             local_logo_path = copy_results.get(logo_filename) if logo_filename else None
 
             # Get video duration from batch query
+            video_info = None
             if item_type == 'image':
                 item_duration = item.get('duration', 5)
             else:
@@ -390,15 +435,18 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
                 item_duration = video_info['duration']
 
             # Generate ASS subtitle file if text animation is enabled
+            ass_filename = None
             if item_type == 'video' and item.get('text_animation_text'):
                 text = item['text_animation_text']
-                ass_path = str(Path("temp") / job_id / f"text_{position}.ass")
-                generate_ass_subtitle_file(
-                    text=text,
-                    video_duration=item_duration,
-                    output_path=ass_path
-                )
-                logger.info(f"  [{position}] Text animation ASS file generated")
+                ass_filename = ass_subtitle_filename(text, item_duration)
+                if ass_filename in ass_specs:
+                    logger.info(f"  [{position}] Reusing text animation ASS file {ass_filename}")
+                else:
+                    ass_specs[ass_filename] = {
+                        'text': text,
+                        'video_duration': ass_subtitle_duration(item_duration),
+                        'output_path': str(Path("temp") / job_id / ass_filename)
+                    }
 
             # Build processed item dict for FFmpeg builder
             processed_items.append({
@@ -407,9 +455,16 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
                 'position': position,
                 'duration': item_duration,
                 'logo_path': local_logo_path,
-                'text_animation_text': item.get('text_animation_text')
+                'text_animation_text': item.get('text_animation_text'),
+                'ass_filename': ass_filename,
+                'video_info': video_info
             })
 
+        # Generate the text animation ASS files (in parallel for larger jobs)
+        if ass_specs:
+            generate_ass_subtitle_files(list(ass_specs.values()))
+            logger.info(f"  Generated {len(ass_specs)} text animation ASS file(s)")
+
         logger.info(f"✓ Processed {len(processed_items)} items")
 
         # Step 2: Calculate total duration
@@ -423,13 +478,22 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
         output_filename = f"{job['channel_name']}_{job_id}.{ext}"
         output_path = str(Path("temp") / job_id / output_filename)
 
-        cmd = build_unified_compilation_command(
-            job_items=processed_items,
-            output_path=output_path,
-            job_id=job_id,
-            enable_4k=job.get('enable_4k', False),
-            output_mxf=job.get('output_mxf', False)
-        )
+        if can_stream_copy(processed_items, enable_4k=job.get('enable_4k', False), output_mxf=job.get('output_mxf', False)):
+            # All inputs already match the output format - join them without re-encoding
+            logger.info("  All items match the output format, stream-copying via concat demuxer")
+            cmd = build_concat_copy_command(
+                job_items=processed_items,
+                output_path=output_path,
+                concat_list_path=str(Path("temp") / job_id / "concat_list.txt")
+            )
+        else:
+            cmd = build_unified_compilation_command(
+                job_items=processed_items,
+                output_path=output_path,
+                job_id=job_id,
+                enable_4k=job.get('enable_4k', False),
+                output_mxf=job.get('output_mxf', False)
+            )
 
         # Step 4: Run FFmpeg with progress tracking
         logger.info("Step 4: Processing video with FFmpeg")
@@ -465,15 +529,6 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
         processing_time = time.time() - start_time
         logger.info(f"Step 6: Job completed in {processing_time:.2f}s")
 
-        supabase.table('jobs').update({
-            'status': 'completed',
-            'progress': 100,
-            'progress_message': 'Completed',
-            'output_path': final_output_path,
-            'final_duration': total_duration,
-            'completed_at': datetime.utcnow().isoformat()
-        }).eq('job_id', job_id).execute()
-
         # Count actual video items (not intro, outro, transitions, images)
         video_count = len([item for item in items if item['item_type'] == 'video'])
 
@@ -488,25 +543,38 @@ def _process_compilation(task: Task, job_id: str, worker_type: str):
         if job.get('enable_4k'):
             features_used.append('4k_output')
 
-        # Insert to BigQuery
-        insert_compilation_result({
-            "job_id": job_id,
-            "user_id": user_id,
-            "channel_name": job['channel_name'],
-            "timestamp": datetime.utcnow().isoformat(),
-            "video_count": video_count,
-            "total_duration": total_duration,
-            "output_path": final_output_path,
-            "worker_id": task.request.hostname,
-            "features_used": features_used,
-            "processing_time": processing_time,
-            "status": "completed"
-        })
+        # Mark completed first: the history row is only written for a job that really is
+        # completed (a failed status write must not leave a row behind, or a retry a duplicate)
+        supabase.table('jobs').update({
+            'status': 'completed',
+            'progress': 100,
+            'progress_message': 'Completed',
+            'output_path': final_output_path,
+            'final_duration': total_duration,
+            'completed_at': datetime.utcnow().isoformat()
+        }).eq('job_id', job_id).execute()
+
+        # Insert to BigQuery in the background while the temp files are cleaned up
+        with ThreadPoolExecutor(max_workers=1) as history_pool:
+            history_insert = history_pool.submit(insert_compilation_result, {
+                "job_id": job_id,
+                "user_id": user_id,
+                "channel_name": job['channel_name'],
+                "timestamp": datetime.utcnow().isoformat(),
+                "video_count": video_count,
+                "total_duration": total_duration,
+                "output_path": final_output_path,
+                "worker_id": task.request.hostname,
+                "features_used": features_used,
+                "processing_time": processing_time,
+                "status": "completed"
+            })
 
-        # Cleanup temp files
-        cleanup_temp_dir(job_id)
+            # Cleanup temp files
+            cleanup_temp_dir(job_id)
 
-        logger.info("=== Job Completed Successfully ===")
+            logger.info("=== Job Completed Successfully ===")
+            history_insert.result()
 
         return {
             "status": "completed",